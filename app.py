@@ -6,8 +6,10 @@ Built by Sai Kiran Patirla
 
 import streamlit as st
 import os
+import uuid
 from dotenv import load_dotenv
 from datetime import datetime
+from src.article import fingerprint
 
 # MUST BE FIRST STREAMLIT COMMAND
 st.set_page_config(
@@ -305,6 +307,7 @@ def init_session_state():
         'articles': [],
         'company': "",
         'insight': "",
+        'signals': {},
         'current_provider': "",
         'qa_history': [],
         'qa_input_key': 0,
@@ -313,11 +316,14 @@ def init_session_state():
         'last_search': "",
         'search_query': "",
         'trigger_search': False,
+        'session_id': None,
     }
     for key, value in defaults.items():
         if key not in st.session_state:
             if key == 'asked_quick_questions':
                 st.session_state[key] = set()
+            elif key == 'session_id':
+                st.session_state[key] = uuid.uuid4().hex
             else:
                 st.session_state[key] = value
 
@@ -329,12 +335,15 @@ def load_components():
     from src.news_fetcher import NewsFetcher
     from src.text_processor import TextProcessor
     from src.summarizer import Summarizer
-    from src.vector_store import VectorStore
+    from src.store_manager import VectorStoreManager
+    from src.deduplicator import ArticleDeduplicator
     return {
         "news": NewsFetcher(),
         "processor": TextProcessor(),
+        "dedup": ArticleDeduplicator(),
         "summarizer": Summarizer(),
-        "vectors": VectorStore()
+        # One index per browser session; a shared store let users clobber each other
+        "vectors": VectorStoreManager()
     }
 
 try:
@@ -345,22 +354,30 @@ except Exception as e:
     init_error = str(e)
 
 # ============ HELPER FUNCTIONS ============
+def get_vector_store():
+    """This session's index, rebuilt from session articles if it was evicted or is stale"""
+    return components["vectors"].get(st.session_state.session_id, st.session_state.articles)
+
 def clear_all_state():
     """Clear all search-related state"""
     st.session_state.articles = []
     st.session_state.company = ""
     st.session_state.insight = ""
+    st.session_state.signals = {}
     st.session_state.qa_history = []
     st.session_state.asked_quick_questions = set()
     st.session_state.last_search = ""
     st.session_state.search_query = ""
     st.session_state.current_provider = ""
     st.session_state.search_key += 1
+    if init_success:
+        components["vectors"].release(st.session_state.session_id)
 
 def perform_search(search_term: str, days: int, max_arts: int):
     """Perform the actual search and analysis"""
     st.session_state.articles = []
     st.session_state.insight = ""
+    st.session_state.signals = {}
     st.session_state.qa_history = []
     st.session_state.asked_quick_questions = set()
     st.session_state.company = search_term
@@ -384,13 +401,41 @@ def perform_search(search_term: str, days: int, max_arts: int):
         
         st.write(f"🔧 Processing {len(articles)} articles...")
         processed = components["processor"].process_articles(articles)
+        processed = components["dedup"].filter(processed)
+        if len(processed) < len(articles):
+            st.write(f"🧹 Removed {len(articles) - len(processed)} duplicate stories")
         st.session_state.articles = processed
         
         st.write("🧠 Building search index...")
-        components["vectors"].add_documents(processed)
+        components["vectors"].get(st.session_state.session_id, processed)
+        
+        # Lexicon read is instant; show it while the LLM call is in flight
+        signals = components["summarizer"].preliminary_signals(processed, search_term)
+        signals.pop("per_article", None)
+        st.session_state.signals = signals
+        st.write(f"⚡ Preliminary read: {signals_line(signals)}")
         
         st.write("💡 Generating AI analysis...")
-        insight = components["summarizer"].generate_investment_insight(processed, search_term)
+        summarizer = components["summarizer"]
+        if summarizer.structured_output:
+            # Validated JSON, reused from the insight store for an unchanged article set
+            insight = summarizer.render_insight(
+                summarizer.generate_structured_insight(processed, search_term), search_term
+            )
+        else:
+            # Rendered token by token; the final text is kept for the insight box
+            progress = st.empty()
+            
+            def report_map(done: int, total: int):
+                # Map-reduce mode reads every article before the first token arrives
+                if done < total:
+                    progress.write(f"🗺️ Extracting signals: {done}/{total} articles")
+                else:
+                    progress.empty()
+            
+            insight = st.write_stream(
+                summarizer.stream_investment_insight(processed, search_term, on_progress=report_map)
+            )
         st.session_state.insight = insight
         st.session_state.current_provider = components["summarizer"].get_current_provider()
         
@@ -399,18 +444,29 @@ def perform_search(search_term: str, days: int, max_arts: int):
     st.success(f"🎉 Analyzed **{len(processed)} articles** about **{search_term}**")
     return True
 
+def signals_line(signals: dict) -> str:
+    """One-line summary of the offline lexicon scores"""
+    actions = signals.get("analyst_actions", [])
+    positive = sum(1 for a in actions if a["action"] in ("upgrade", "target_raise"))
+    negative = sum(1 for a in actions if a["action"] in ("downgrade", "target_cut"))
+    line = (
+        f"**{signals['sentiment']}** (tone {signals['score']:+.2f}) • "
+        f"{signals['bullish_articles']} bullish / {signals['bearish_articles']} bearish articles"
+    )
+    if positive or negative:
+        line += f" • analysts {positive}↑ {negative}↓"
+    return line
+
 def ask_question(question: str, question_id: str = None):
     """Process a question and add to history"""
-    context_parts = []
-    for a in st.session_state.articles[:3]:
-        title = a.get('title', '')
-        content = a.get('processed_text', '') or a.get('content', '') or a.get('description', '')
-        context_parts.append(f"{title}\n{content[:300]}")
-    context = "\n---\n".join(context_parts)
-    
-    answer = components["summarizer"].answer_question(
-        question, context, st.session_state.company
-    )
+    # Retrieve the passages relevant to this question, packed into the token budget
+    context = get_vector_store().get_context(question)
+    
+    st.markdown(f"**❓ {question}**")
+    answer = st.write_stream(components["summarizer"].stream_answer(
+        question, context, st.session_state.company,
+        fingerprint=fingerprint(st.session_state.articles)
+    ))
     st.session_state.current_provider = components["summarizer"].get_current_provider()
     
     st.session_state.qa_history.insert(0, {
@@ -447,16 +503,51 @@ with st.sidebar:
     
     st.markdown("---")
     st.markdown("**🔌 API Status**")
+    # Configured providers show their circuit state: ✅ closed, 🟡 probing, 🔴 open
+    breaker_icons = {"closed": "✅", "half_open": "🟡", "open": "🔴"}
+    provider_status = components["summarizer"].router.provider_status() if init_success else {}
+    
+    def provider_icon(name: str, configured: bool) -> str:
+        if not configured:
+            return "⭕"
+        return breaker_icons.get(provider_status.get(name, {}).get("state"), "✅")
+    
     col1, col2 = st.columns(2)
     with col1:
         st.markdown(f"{'✅' if NEWS_API_KEY else '❌'} NewsAPI")
-        st.markdown(f"{'✅' if GROQ_API_KEY else '⭕'} Groq")
+        st.markdown(f"{provider_icon('Groq', GROQ_API_KEY)} Groq")
     with col2:
-        st.markdown(f"{'✅' if OPENAI_API_KEY else '⭕'} OpenAI")
+        st.markdown(f"{provider_icon('OpenAI', OPENAI_API_KEY)} OpenAI")
+    
+    for name, status in provider_status.items():
+        if status["state"] == "open":
+            st.caption(f"🔴 {name} paused • retry in {status['retry_in_s']:.0f}s")
     
     if st.session_state.current_provider:
         st.markdown(f"**Active:** `{st.session_state.current_provider}`")
     
+    if init_success:
+        news_cache = components["news"].cache_stats()
+        news_http = components["news"].http_stats()
+        st.caption(f"⚡ News cache: {news_cache['hits']} hits / {news_cache['misses']} misses")
+        if news_http["requests"]:
+            st.caption(f"🌐 NewsAPI p95: {news_http['p95_ms']:.0f} ms • {news_http['retries']} retries")
+        llm_cache = components["summarizer"].router.cache_stats()
+        if llm_cache:
+            st.caption(
+                f"🧠 LLM cache: {llm_cache['hits']} hits ({llm_cache['semantic_hits']} similar) / "
+                f"{llm_cache['misses']} misses • {llm_cache['hit_rate']:.0%}"
+            )
+        llm_latency = components["summarizer"].router.latency_stats()
+        timings = [f"{name} p95 {s['p95_ms']:.0f} ms" for name, s in llm_latency.items() if s.get("count")]
+        if timings:
+            st.caption("⏱️ " + " • ".join(timings))
+        usage = components["summarizer"].router.usage_stats()
+        if usage:
+            tokens_in = sum(u["tokens_in"] for u in usage.values())
+            tokens_out = sum(u["tokens_out"] for u in usage.values())
+            st.caption(f"🔢 Tokens: {tokens_in:,} in / {tokens_out:,} out")
+    
     st.markdown("---")
     st.markdown("**🛠️ Actions**")
     
@@ -591,6 +682,8 @@ if st.session_state.articles:
         ''', unsafe_allow_html=True)
     
     st.markdown('<p class="section-title">🤖 AI Investment Analysis</p>', unsafe_allow_html=True)
+    if st.session_state.signals:
+        st.caption(f"⚡ Lexicon read: {signals_line(st.session_state.signals)}")
     st.markdown(f'<div class="insight-box">{st.session_state.insight}</div>', unsafe_allow_html=True)
     
     st.markdown("---")
@@ -604,6 +697,7 @@ if st.session_state.articles:
     ]
     
     qcols = st.columns(4)
+    pending_question = None
     
     for i, (qid, label, full_question) in enumerate(quick_questions):
         with qcols[i]:
@@ -623,9 +717,7 @@ if st.session_state.articles:
                     key=f"{qid}_{st.session_state.search_key}",
                     use_container_width=True
                 ):
-                    with st.spinner("🤔 Thinking..."):
-                        ask_question(full_question, qid)
-                    st.rerun()
+                    pending_question = (full_question, qid)
     
     with st.form(key=f"qa_form_{st.session_state.qa_input_key}", clear_on_submit=True):
         col1, col2 = st.columns([5, 1])
@@ -639,10 +731,13 @@ if st.session_state.articles:
             ask_submitted = st.form_submit_button("Ask", use_container_width=True)
         
         if ask_submitted and custom_question and custom_question.strip():
-            with st.spinner("🤔 Thinking..."):
-                ask_question(custom_question.strip())
+            pending_question = (custom_question.strip(), None)
             st.session_state.qa_input_key += 1
-            st.rerun()
+    
+    # Answer streams full-width below the inputs, then joins the history on rerun
+    if pending_question:
+        ask_question(*pending_question)
+        st.rerun()
     
     if st.session_state.qa_history:
         st.markdown(f"**📜 Answers ({len(st.session_state.qa_history)})**")
@@ -663,6 +758,12 @@ if st.session_state.articles:
     with col2:
         show_summaries = st.checkbox("Show AI summaries", value=False)
     
+    summaries = []
+    if show_summaries:
+        # One concurrent batch; memoized, so reruns don't call the LLM again
+        with st.spinner("Generating summaries..."):
+            summaries = components["summarizer"].summarize_articles(articles)
+    
     for i, article in enumerate(articles):
         with st.expander(f"📄 {article['title'][:70]}...", expanded=False):
             cols = st.columns([2, 1])
@@ -678,10 +779,8 @@ if st.session_state.articles:
             if article.get('description'):
                 st.markdown(f"*{article['description']}*")
             
-            if show_summaries:
-                with st.spinner("Generating..."):
-                    summary = components["summarizer"].summarize_article(article)
-                st.info(f"**🤖 AI Summary:** {summary}")
+            if summaries:
+                st.info(f"**🤖 AI Summary:** {summaries[i]}")
 
 else:
     st.markdown("""
@@ -0,0 +1,92 @@
+"""
+Dense retrieval benchmark
+Encode throughput and query latency at 1k / 10k / 100k documents using a
+locally cached sentence-transformers model (no network: HF_HUB_OFFLINE=1).
+
+    python benchmarks/bench_embeddings.py [sizes] [index_type] [encode_cap]
+    python benchmarks/bench_embeddings.py 1000,10000,100000 flat 10000
+
+Encoding 100k articles on CPU takes minutes, so at most `encode_cap`
+documents are encoded for the throughput figure; larger indexes are filled
+with jittered copies of those vectors to measure query latency.
+"""
+
+import os
+import sys
+import time
+import random
+
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from src.llm_router import EmbeddingRouter
+from src.dense_index import DenseIndex
+
+WORDS = ("apple tesla nvidia shares rose fell after earnings beat missed revenue guidance "
+         "analyst upgrade downgrade market investors quarter billion growth margin outlook "
+         "chips deliveries iphone cloud ai demand regulators lawsuit dividend buyback").split()
+
+QUERIES = [
+    "What did analysts say about EPS guidance?",
+    "Main risks for investors this quarter",
+    "Did deliveries beat expectations?",
+    "Any upgrades or downgrades?",
+]
+
+
+def make_texts(n: int):
+    rng = random.Random(7)
+    return [" ".join(rng.choice(WORDS) for _ in range(80)) for _ in range(n)]
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+
+def main():
+    sizes = [int(s) for s in (sys.argv[1] if len(sys.argv) > 1 else "1000,10000,100000").split(",")]
+    kind = sys.argv[2] if len(sys.argv) > 2 else "flat"
+    encode_cap = int(sys.argv[3]) if len(sys.argv) > 3 else 10000
+
+    embedder = EmbeddingRouter(backend="dense")
+    if embedder.should_use_tfidf():
+        print("❌ Dense model unavailable - cache it first (EMBEDDING_MODEL) or install sentence-transformers")
+        return
+
+    print(f"\nmodel={embedder.model_name} dim={embedder.dimension} index={kind}\n")
+    print(f"{'docs':>8} {'encode docs/s':>14} {'build s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+
+    rng = np.random.default_rng(0)
+    for n in sizes:
+        texts = make_texts(min(n, encode_cap))
+        start = time.perf_counter()
+        vectors = embedder.encode(texts)
+        encode_rate = len(texts) / (time.perf_counter() - start)
+
+        if len(vectors) < n:
+            reps = int(np.ceil(n / len(vectors)))
+            vectors = np.tile(vectors, (reps, 1))[:n]
+            vectors = vectors + rng.normal(0, 0.01, vectors.shape).astype(np.float32)
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+        start = time.perf_counter()
+        index = DenseIndex(embedder.dimension, kind)
+        index.add(vectors)
+        build = time.perf_counter() - start
+
+        latencies = []
+        for _ in range(25):
+            for q in QUERIES:
+                start = time.perf_counter()
+                index.search(embedder.encode([q]), 5)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        print(f"{n:>8,} {encode_rate:>14,.0f} {build:>8.2f} "
+              f"{percentile(latencies, 0.5):>8.2f} {percentile(latencies, 0.95):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Q&A context benchmark
+Compares prompt tokens and relevance of the old "first three articles"
+context against retrieval with passage chunking and token-budget packing.
+
+    python benchmarks/bench_qa_context.py
+"""
+
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.article import Article
+from src.text_processor import TextProcessor
+from src.vector_store import VectorStore
+from src.tokens import count_tokens
+
+FILLER = ("the company said on a call with reporters that it continues to monitor conditions "
+          "across its markets and remains focused on execution over the coming months").split()
+
+TOPICS = {
+    "What are the key growth catalysts and opportunities?":
+        "new product launches and expanding cloud services are expected to drive growth opportunities",
+    "What are the main risks investors should watch?":
+        "regulators opened an antitrust probe and supply chain risks could weigh on margins",
+    "What do analysts recommend? Any upgrades or downgrades?":
+        "analysts at Morgan Stanley upgraded the stock to overweight and raised the price target",
+    "What is the future outlook based on recent news?":
+        "management raised its full-year outlook and guided revenue above consensus",
+}
+
+
+def make_corpus(n: int = 20):
+    rng = random.Random(3)
+    articles = []
+    topical = list(TOPICS.values())
+    for i in range(n):
+        filler = " ".join(rng.choice(FILLER) for _ in range(rng.randint(60, 160)))
+        body = filler
+        if 3 <= i < 3 + len(topical):
+            # Relevant articles never sit in the first three slots
+            words = filler.split()
+            cut = rng.randint(10, len(words) - 10)
+            body = " ".join(words[:cut] + [topical[i - 3]] + words[cut:])
+        articles.append(Article(
+            title=f"Acme Corp update {i}",
+            description=" ".join(rng.choice(FILLER) for _ in range(25)),
+            content=body,
+            url=f"https://news.example.com/{i}",
+            source="Example Wire",
+        ))
+    return articles
+
+
+def legacy_context(articles):
+    parts = []
+    for a in articles[:3]:
+        parts.append(f"{a.title}\n{a.text[:300]}")
+    return "\n---\n".join(parts)
+
+
+def prompt(company, context, question):
+    return f"About {company}: {context}\n\nQuestion: {question}\n\nAnswer concisely and specifically. Be helpful."
+
+
+def main():
+    articles = TextProcessor().process_articles(make_corpus())
+    store = VectorStore()
+    store.add_documents(articles)
+
+    legacy_tokens, rag_tokens, legacy_hits, rag_hits = [], [], 0, 0
+    for question, fact in TOPICS.items():
+        old = legacy_context(articles)
+        new = store.get_context(question)
+        legacy_tokens.append(count_tokens(prompt("Acme", old, question)))
+        rag_tokens.append(count_tokens(prompt("Acme", new, question)))
+        key = " ".join(fact.split()[:4])
+        legacy_hits += key in old
+        rag_hits += key in new
+
+    n = len(TOPICS)
+    old_avg = sum(legacy_tokens) / n
+    new_avg = sum(rag_tokens) / n
+    print(f"\n{'':<22}{'prompt tokens':>14}{'relevant hit':>14}")
+    print(f"{'first-three articles':<22}{old_avg:>14.0f}{legacy_hits:>11}/{n}")
+    print(f"{'RAG (chunked+budget)':<22}{new_avg:>14.0f}{rag_hits:>11}/{n}")
+    print(f"\nprompt tokens per answer: {100 * (1 - new_avg / old_avg):.0f}% fewer")
+
+
+if __name__ == "__main__":
+    main()
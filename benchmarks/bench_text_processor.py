@@ -0,0 +1,71 @@
+"""
+TextProcessor micro-benchmark
+Reports articles/sec for each processing mode on synthetic articles.
+
+    python benchmarks/bench_text_processor.py [n_articles] [workers]
+"""
+
+import os
+import re
+import sys
+import html
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.text_processor import TextProcessor
+
+WORDS = ("apple shares rose after earnings beat revenue guidance analyst upgrade "
+         "market investors quarter billion growth &amp; margin outlook").split()
+
+
+def make_articles(n: int):
+    rng = random.Random(42)
+    articles = []
+    for i in range(n):
+        body = " ".join(rng.choice(WORDS) for _ in range(120))
+        articles.append({
+            "title": f"Headline {i} " + " ".join(rng.choice(WORDS) for _ in range(8)),
+            "description": " ".join(rng.choice(WORDS) for _ in range(25)),
+            "content": f"{body}  https://example.com/story/{i}\n\n more text",
+            "url": f"https://example.com/{i}",
+            "source": rng.choice(["Reuters", "Bloomberg", "CNBC"]),
+        })
+    return articles
+
+
+def legacy_process(articles):
+    """The original per-call regex pipeline, for comparison"""
+    out = []
+    for a in articles:
+        text = " ".join(a[k] for k in ("title", "description", "content") if a.get(k))
+        text = html.unescape(text)
+        text = re.sub(r'https?://\S+', '', text)
+        text = re.sub(r'\s+', ' ', text).strip()
+        out.append({**a, "processed_text": text, "word_count": len(text.split())})
+    return out
+
+
+def run(label, fn, n):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {n / elapsed:>12,.0f} articles/sec  ({elapsed:.3f}s)")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 2)
+    raw = make_articles(n)
+    processor = TextProcessor()
+
+    print(f"\n{n:,} synthetic articles, {workers} workers\n")
+    run("legacy dict pipeline", lambda: legacy_process(raw), n)
+    run("process_articles (serial)", lambda: [a.word_count for a in processor.process_articles(raw)], n)
+    run(f"process_batch x{workers} procs",
+        lambda: [a.word_count for a in processor.process_batch(raw, workers=workers)], n)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,17 +3,23 @@
 AI Equity Research Tool - Source Package
 """
 
+from .article import Article
 from .news_fetcher import NewsFetcher
 from .text_processor import TextProcessor
 from .summarizer import Summarizer
 from .vector_store import VectorStore
+from .store_manager import VectorStoreManager
 from .llm_router import LLMRouter, EmbeddingRouter
+from .deduplicator import ArticleDeduplicator
 
 __all__ = [
+    "Article",
     "NewsFetcher",
     "TextProcessor", 
     "Summarizer",
     "VectorStore",
+    "VectorStoreManager",
     "LLMRouter",
-    "EmbeddingRouter"
+    "EmbeddingRouter",
+    "ArticleDeduplicator"
 ]
\ No newline at end of file
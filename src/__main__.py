@@ -0,0 +1,202 @@
+"""
+Batch research from the command line
+
+    python -m src watchlist.txt --out results.jsonl --workers 4
+
+The watchlist has one company or ticker per line (blank lines and # comments
+are ignored). Results are appended as each company finishes, so a rerun
+after a crash skips companies already written.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Set
+
+from dotenv import load_dotenv
+
+
+def read_watchlist(path: str) -> List[str]:
+    companies = []
+    seen = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            # Tolerate CSV exports: the first column is the company
+            name = line.split("#", 1)[0].split(",", 1)[0].strip()
+            if name and name.lower() not in seen:
+                seen.add(name.lower())
+                companies.append(name)
+    return companies
+
+
+def read_checkpoint(path: str) -> Set[str]:
+    """Companies already completed in an earlier run (a torn last line is ignored)"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("status") in ("ok", "no_articles"):
+                done.add(record["company"].lower())
+    return done
+
+
+def read_records(path: str) -> List[Dict]:
+    """Latest record per company from a checkpoint (reruns append retries of failed companies)"""
+    latest = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            key = record["company"].lower()
+            latest.pop(key, None)
+            latest[key] = record
+    return list(latest.values())
+
+
+def write_jsonl(jsonl_path: str, out_path: str) -> bool:
+    """Copy the checkpoint's final records to a separate JSONL output"""
+    try:
+        tmp = out_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for record in read_records(jsonl_path):
+                f.write(json.dumps(record, default=str) + "\n")
+        os.replace(tmp, out_path)
+        return True
+    except Exception as e:
+        print(f"⚠️ JSONL export failed ({e}); results remain in {jsonl_path}")
+        return False
+
+
+def write_parquet(jsonl_path: str, parquet_path: str) -> bool:
+    try:
+        import pandas as pd
+        frame = pd.json_normalize(read_records(jsonl_path), max_level=1)
+        # Nested values (lists, structured insight) are stored as JSON text
+        for column in frame.columns:
+            if frame[column].map(lambda v: isinstance(v, (list, dict))).any():
+                frame[column] = frame[column].map(lambda v: json.dumps(v) if isinstance(v, (list, dict)) else v)
+        frame.to_parquet(parquet_path, index=False)
+        return True
+    except Exception as e:
+        print(f"⚠️ Parquet export failed ({e}); results remain in {jsonl_path}")
+        return False
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src", description="Run equity research for a watchlist")
+    parser.add_argument("watchlist", help="file with one company or ticker per line")
+    parser.add_argument("--out", default="results.jsonl", help="output path (.jsonl or .parquet)")
+    parser.add_argument("--days", type=int, default=7, help="days of news to look back")
+    parser.add_argument("--max-articles", type=int, default=10, help="articles per company")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("PIPELINE_WORKERS", "4")), help="companies analyzed in parallel")
+    parser.add_argument("--checkpoint", help="progress file (default: the JSONL output itself)")
+    parser.add_argument("--no-resume", action="store_true", help="ignore the checkpoint and start over")
+    parser.add_argument("--structured", action="store_true", help="store validated JSON insights (INSIGHT_OUTPUT=json)")
+    parser.add_argument("--snapshot-dir", help="save each company's vector index here")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    load_dotenv()
+    args = parse_args(argv)
+
+    companies = read_watchlist(args.watchlist)
+    if not companies:
+        print("❌ Watchlist is empty")
+        return 1
+
+    parquet = args.out.lower().endswith(".parquet")
+    checkpoint = args.checkpoint or (args.out + ".jsonl" if parquet else args.out)
+    if args.no_resume and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    done = read_checkpoint(checkpoint)
+    pending = [c for c in companies if c.lower() not in done]
+    if done:
+        print(f"↩️ Resuming: {len(companies) - len(pending)} of {len(companies)} companies already done")
+
+    from .pipeline import ResearchPipeline
+    try:
+        pipeline = ResearchPipeline(structured=True if args.structured else None)
+    except ValueError as e:
+        print(e)
+        return 1
+
+    write_lock = threading.Lock()
+    progress = {"done": 0, "failures": 0}
+    start = time.perf_counter()
+
+    directory = os.path.dirname(os.path.abspath(checkpoint))
+    os.makedirs(directory, exist_ok=True)
+    out = open(checkpoint, "a", encoding="utf-8")
+
+    def run(company: str, fetched):
+        if isinstance(fetched, Exception):
+            record = {"company": company, "status": "error", "error": str(fetched)}
+        else:
+            try:
+                record = pipeline.analyze(company, args.days, args.max_articles, args.snapshot_dir, articles=fetched)
+            except Exception as e:
+                record = {"company": company, "status": "error", "error": str(e)}
+        record["completed_at"] = time.time()
+        with write_lock:
+            out.write(json.dumps(record, default=str) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+            progress["done"] += 1
+            i = progress["done"]
+            if record["status"] == "error":
+                progress["failures"] += 1
+                print(f"❌ [{i}/{len(pending)}] {record['company']}: {record['error']}")
+            else:
+                print(f"✅ [{i}/{len(pending)}] {record['company']}: {record.get('sentiment', '-')} ({record['articles']} articles)")
+
+    async def fetch_all(pool: ThreadPoolExecutor):
+        # One rate-limited async fan-out for the whole watchlist; each company is
+        # analyzed on the pool as soon as its articles arrive
+        async for company, fetched in pipeline.news.fetch_many(
+            pending, args.days, args.max_articles, concurrency=max(1, args.workers), return_exceptions=True
+        ):
+            pool.submit(run, company, fetched)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            asyncio.run(fetch_all(pool))
+    finally:
+        out.close()
+    failures = progress["failures"]
+
+    elapsed = time.perf_counter() - start
+    if parquet:
+        if write_parquet(checkpoint, args.out):
+            print(f"📦 Wrote {args.out}")
+    elif os.path.abspath(checkpoint) != os.path.abspath(args.out) and write_jsonl(checkpoint, args.out):
+        print(f"📦 Wrote {args.out}")
+
+    stats = pipeline.stats()
+    llm_cache = stats["llm_cache"]
+    news_cache = stats["news_cache"]
+    rate = len(pending) / elapsed * 60 if elapsed > 0 else 0.0
+    print("")
+    print(f"📊 {len(pending)} companies in {elapsed:.1f}s ({rate:.1f} companies/min), {failures} failed")
+    print(f"   LLM calls: {stats['llm_calls']} ({stats['tokens_in']:,} tokens in / {stats['tokens_out']:,} out)")
+    print(
+        f"   Cache hits: LLM {llm_cache.get('hits', 0)} ({llm_cache.get('hit_rate', 0):.0%}), "
+        f"news {news_cache.get('hits', 0)} ({news_cache.get('hit_rate', 0):.0%})"
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
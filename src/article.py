@@ -0,0 +1,197 @@
+"""
+Article Record
+Compact slotted article type shared by every pipeline stage
+"""
+
+import sys
+import hashlib
+from datetime import datetime, timezone
+from typing import Dict, Optional, Any, Iterator, Iterable, Union
+
+DISPLAY_FORMAT = "%B %d, %Y at %I:%M %p"
+
+
+class Article:
+    """A single news article
+
+    Attribute access is the fast path. The Mapping-style `get` / `[]` shim
+    keeps older dict-based callers (mainly the Streamlit UI) working; through
+    the shim `published_at` is the display string, while the attribute is a
+    parsed datetime.
+    """
+
+    __slots__ = (
+        "title", "description", "content", "url", "source",
+        "published_at", "author", "image_url",
+        "_processed_text", "_word_count"
+    )
+
+    FIELDS = (
+        "title", "description", "content", "url", "source",
+        "published_at", "author", "image_url", "processed_text", "word_count"
+    )
+
+    def __init__(
+        self,
+        title: str = "",
+        description: str = "",
+        content: str = "",
+        url: str = "",
+        source: str = "Unknown",
+        published_at: Optional[datetime] = None,
+        author: str = "Staff Reporter",
+        image_url: str = "",
+        processed_text: Optional[str] = None
+    ):
+        self.title = title
+        self.description = description
+        self.content = content
+        self.url = url
+        # A handful of outlets repeat across thousands of articles
+        self.source = sys.intern(source or "Unknown")
+        self.published_at = published_at
+        self.author = author
+        self.image_url = image_url or ""
+        self._processed_text = processed_text
+        self._word_count = None
+
+    # ---------- lazy derived fields ----------
+
+    @property
+    def processed_text(self) -> str:
+        if self._processed_text is None:
+            from .text_processor import clean_text
+            self._processed_text = clean_text(
+                " ".join(p for p in (self.title, self.description, self.content) if p)
+            )
+        return self._processed_text
+
+    @processed_text.setter
+    def processed_text(self, value: str):
+        self._processed_text = value
+        self._word_count = None
+
+    @property
+    def word_count(self) -> int:
+        if self._word_count is None:
+            from .text_processor import count_words
+            self._word_count = count_words(self.processed_text)
+        return self._word_count
+
+    @property
+    def published_display(self) -> str:
+        """Date formatted for display"""
+        if self.published_at is None:
+            return "Unknown date"
+        return self.published_at.strftime(DISPLAY_FORMAT)
+
+    @property
+    def text(self) -> str:
+        """Best available body text"""
+        return self._processed_text or self.content or self.description
+
+    # ---------- construction / serialization ----------
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Article":
+        """Build from a legacy article dict or a to_dict() payload"""
+        return cls(
+            title=data.get("title", "") or "",
+            description=data.get("description", "") or "",
+            content=data.get("content", "") or "",
+            url=data.get("url", "") or "",
+            source=data.get("source", "Unknown") or "Unknown",
+            published_at=parse_date(data.get("published_at")),
+            author=data.get("author") or "Staff Reporter",
+            image_url=data.get("image_url", "") or "",
+            processed_text=data.get("processed_text")
+        )
+
+    @classmethod
+    def coerce(cls, obj: Any) -> "Article":
+        """Accept either an Article or a dict"""
+        return obj if isinstance(obj, cls) else cls.from_dict(obj)
+
+    def to_dict(self) -> Dict:
+        """JSON-safe dict (published_at as ISO 8601)"""
+        return {
+            "title": self.title,
+            "description": self.description,
+            "content": self.content,
+            "url": self.url,
+            "source": self.source,
+            "published_at": self.published_at.isoformat() if self.published_at else None,
+            "author": self.author,
+            "image_url": self.image_url,
+            "processed_text": self._processed_text
+        }
+
+    # ---------- dict-compat shim ----------
+
+    def __getitem__(self, key: str):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        if key == "published_at":
+            return self.published_display
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS
+
+    def keys(self) -> Iterator[str]:
+        return iter(self.FIELDS)
+
+    def __repr__(self) -> str:
+        return f"Article(title={self.title[:40]!r}, source={self.source!r})"
+
+
+def parse_date(value: Any) -> Optional[datetime]:
+    """Parse NewsAPI / ISO timestamps; None when missing or malformed"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        pass
+    # Cache entries written before Article stored display strings (UTC)
+    try:
+        return datetime.strptime(str(value), DISPLAY_FORMAT).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def fingerprint(articles: Iterable[Union[Article, Dict]]) -> str:
+    """Order-independent identity of an article set (URLs, else titles)"""
+    ids = sorted({(a.url or a.title) for a in map(Article.coerce, articles)})
+    return hashlib.sha1("\n".join(ids).encode("utf-8")).hexdigest()
+
+
+class Passage(Article):
+    """An overlapping chunk of an article, indexed for passage-level retrieval"""
+
+    __slots__ = ("article", "chunk_index")
+
+    def __init__(self, article: Article, text: str, chunk_index: int):
+        super().__init__(
+            title=article.title,
+            url=article.url,
+            source=article.source,
+            published_at=article.published_at,
+            author=article.author,
+            image_url=article.image_url,
+            processed_text=text
+        )
+        self.article = article
+        self.chunk_index = chunk_index
+
+    def __repr__(self) -> str:
+        return f"Passage(title={self.title[:40]!r}, chunk={self.chunk_index})"
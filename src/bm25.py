@@ -0,0 +1,138 @@
+"""
+BM25 Keyword Index
+Inverted index with Okapi BM25 scoring; complements vector retrieval for
+exact terms like tickers and "EPS guidance".
+"""
+
+import re
+from collections import defaultdict
+from typing import List, Dict, Tuple
+import numpy as np
+
+from .article import Article
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9$]+(?:[.&'-][a-z0-9]+)*")
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "their this to was were will with what which who how any about do does did".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOP_WORDS]
+
+
+class BM25Index:
+    """Append-only BM25 index; removed rows are tombstoned and compacted away"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, compact_ratio: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        # Rebuild once this share of rows is dead
+        self.compact_ratio = compact_ratio
+        self.clear()
+
+    def clear(self):
+        self.docs: List[Article] = []
+        self.alive = np.zeros(0, dtype=bool)
+        self.doc_lengths = np.zeros(0, dtype=np.float32)
+        self._postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self._compiled: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._url_rows: Dict[str, List[int]] = {}
+
+    def add(self, docs: List[Article], texts: List[str]):
+        start = len(self.docs)
+        lengths = []
+        for offset, text in enumerate(texts):
+            counts: Dict[str, int] = {}
+            tokens = tokenize(text)
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                self._postings[token].append((start + offset, tf))
+                self._compiled.pop(token, None)
+            lengths.append(len(tokens))
+
+        for offset, doc in enumerate(docs):
+            if doc.url:
+                self._url_rows.setdefault(doc.url, []).append(start + offset)
+        self.docs.extend(docs)
+        self.alive = np.concatenate([self.alive, np.ones(len(docs), dtype=bool)])
+        self.doc_lengths = np.concatenate([self.doc_lengths, np.asarray(lengths, dtype=np.float32)])
+
+    def remove(self, url: str) -> int:
+        return self.remove_urls({url})
+
+    def remove_urls(self, urls) -> int:
+        removed = 0
+        for url in urls:
+            for row in self._url_rows.pop(url, []):
+                if self.alive[row]:
+                    self.alive[row] = False
+                    removed += 1
+        dead = len(self.docs) - int(self.alive.sum())
+        if removed and dead > self.compact_ratio * len(self.docs):
+            self.compact()
+        return removed
+
+    def compact(self):
+        """Drop tombstoned rows from the docs, lengths and postings"""
+        keep = self.alive
+        new_ids = np.cumsum(keep) - 1
+        postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for token, pairs in self._postings.items():
+            kept = [(int(new_ids[row]), tf) for row, tf in pairs if keep[row]]
+            if kept:
+                postings[token] = kept
+        self._postings = postings
+        self._compiled = {}
+        self.docs = [doc for doc, alive in zip(self.docs, keep) if alive]
+        self.doc_lengths = self.doc_lengths[keep]
+        self.alive = np.ones(len(self.docs), dtype=bool)
+        self._url_rows = {}
+        for row, doc in enumerate(self.docs):
+            if doc.url:
+                self._url_rows.setdefault(doc.url, []).append(row)
+
+    def _posting(self, token: str) -> Tuple[np.ndarray, np.ndarray]:
+        compiled = self._compiled.get(token)
+        if compiled is None:
+            pairs = self._postings.get(token, [])
+            ids = np.fromiter((p[0] for p in pairs), dtype=np.int64, count=len(pairs))
+            tfs = np.fromiter((p[1] for p in pairs), dtype=np.float32, count=len(pairs))
+            compiled = self._compiled[token] = (ids, tfs)
+        return compiled
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score for every row (dead rows score 0)"""
+        n = len(self.docs)
+        scores = np.zeros(n, dtype=np.float32)
+        live = int(self.alive.sum())
+        if not live:
+            return scores
+
+        avgdl = float(self.doc_lengths[self.alive].mean()) or 1.0
+        for token in set(tokenize(query)):
+            ids, tfs = self._posting(token)
+            if not len(ids):
+                continue
+            mask = self.alive[ids]
+            ids, tfs = ids[mask], tfs[mask]
+            df = len(ids)
+            if not df:
+                continue
+            idf = np.log(1 + (live - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[ids] / avgdl)
+            scores[ids] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+        return scores
+
+    def search(self, query: str, top_k: int) -> List[Article]:
+        scores = self.scores(query)
+        hits = np.flatnonzero(scores > 0)
+        if not len(hits):
+            return []
+        k = min(top_k, len(hits))
+        top = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+        return [self.docs[i] for i in top]
@@ -0,0 +1,171 @@
+"""
+Circuit Breaker
+Per-provider closed/open/half-open breaker over a rolling window of call
+outcomes and latencies
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# (generation, is_probe): which breaker state a call was admitted under
+Permit = Tuple[int, bool]
+
+
+class CircuitBreaker:
+    """Skips a sick upstream quickly and lets a single probe test its recovery"""
+
+    def __init__(
+        self,
+        name: str,
+        window: Optional[int] = None,
+        min_calls: Optional[int] = None,
+        error_rate: Optional[float] = None,
+        slow_seconds: Optional[float] = None,
+        slow_rate: Optional[float] = None,
+        cooldown: Optional[float] = None,
+        max_cooldown: float = 300.0
+    ):
+        self.name = name
+        self.min_calls = min_calls if min_calls is not None else int(os.getenv("LLM_BREAKER_MIN_CALLS", "5"))
+        self.error_rate = error_rate if error_rate is not None else float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))
+        self.slow_seconds = slow_seconds if slow_seconds is not None else float(os.getenv("LLM_BREAKER_SLOW_SECONDS", "10"))
+        self.slow_rate = slow_rate if slow_rate is not None else float(os.getenv("LLM_BREAKER_SLOW_RATE", "0.8"))
+        self.base_cooldown = cooldown if cooldown is not None else float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+        self.max_cooldown = max_cooldown
+        window = window if window is not None else int(os.getenv("LLM_BREAKER_WINDOW", "20"))
+
+        # (succeeded, slow) for the most recent calls
+        self.outcomes = deque(maxlen=window)
+        self.state = CLOSED
+        self.cooldown = self.base_cooldown
+        self.opened_at = 0.0
+        self.probe_started: Optional[float] = None
+        self.trips = 0
+        # Bumped on every transition; outcomes from an earlier generation are ignored
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Would a call be allowed now? (no side effects)"""
+        with self._lock:
+            return self._state(time.time()) != OPEN or self._probe_free(time.time())
+
+    def allow(self) -> Optional[Permit]:
+        """
+        Claim permission for one call; in half-open state only one probe runs at a time
+        Returns a permit to hand back with the outcome, or None when the call is refused
+        """
+        now = time.time()
+        with self._lock:
+            state = self._state(now)
+            if state == CLOSED:
+                return (self.generation, False)
+            if not self._probe_free(now):
+                return None
+            self.state = HALF_OPEN
+            self.probe_started = now
+            # A lost earlier probe that reports late must not decide for this one
+            self.generation += 1
+            return (self.generation, True)
+
+    def record_success(self, permit: Permit, seconds: float = 0.0):
+        with self._lock:
+            if not self._current(permit):
+                return
+            if permit[1]:
+                # Probe came back healthy
+                self._close()
+                return
+            self.outcomes.append((True, seconds > self.slow_seconds))
+            self._evaluate()
+
+    def record_failure(self, permit: Permit, fatal: bool = False):
+        """Count a failed call; `fatal` (e.g. quota exhausted) opens the breaker at once"""
+        with self._lock:
+            if not self._current(permit):
+                return
+            if permit[1]:
+                # Failed probe: back off longer before the next one
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                self._open()
+                return
+            self.outcomes.append((False, False))
+            if fatal:
+                self._open()
+            else:
+                self._evaluate()
+
+    def release(self, permit: Permit):
+        """Give back an unfinished probe (e.g. a cancelled hedge)"""
+        with self._lock:
+            if permit[1] and self._current(permit):
+                self.probe_started = None
+
+    def _current(self, permit: Permit) -> bool:
+        # Calls admitted before the last transition (e.g. in flight when it opened) don't count
+        return permit[0] == self.generation
+
+    def reset(self):
+        with self._lock:
+            self._close()
+
+    def _state(self, now: float) -> str:
+        if self.state == OPEN and now - self.opened_at >= self.cooldown:
+            return HALF_OPEN
+        return self.state
+
+    def _probe_free(self, now: float) -> bool:
+        if self._state(now) != HALF_OPEN:
+            return False
+        # A probe that never reported back is treated as lost
+        return self.probe_started is None or now - self.probe_started > self.cooldown
+
+    def _evaluate(self):
+        n = len(self.outcomes)
+        if n < self.min_calls:
+            return
+        failures = sum(1 for ok, _ in self.outcomes if not ok)
+        slow = sum(1 for _, is_slow in self.outcomes if is_slow)
+        if failures / n >= self.error_rate or slow / n >= self.slow_rate:
+            self._open()
+
+    def _open(self):
+        if self.state == CLOSED:
+            self.trips += 1
+        self.state = OPEN
+        self.generation += 1
+        self.opened_at = time.time()
+        self.probe_started = None
+        self.outcomes.clear()
+        print(f"🔴 {self.name}: circuit open for {self.cooldown:.0f}s")
+
+    def _close(self):
+        if self.state != CLOSED:
+            print(f"🟢 {self.name}: circuit closed")
+        self.state = CLOSED
+        self.generation += 1
+        self.cooldown = self.base_cooldown
+        self.probe_started = None
+        self.outcomes.clear()
+
+    def stats(self) -> Dict:
+        now = time.time()
+        with self._lock:
+            state = self._state(now)
+            n = len(self.outcomes)
+            failures = sum(1 for ok, _ in self.outcomes if not ok)
+            retry_in = max(0.0, self.cooldown - (now - self.opened_at)) if state == OPEN else 0.0
+        return {
+            "state": state,
+            "calls": n,
+            "error_rate": failures / n if n else 0.0,
+            "trips": self.trips,
+            "retry_in_s": retry_in
+        }
@@ -0,0 +1,205 @@
+"""
+Article Deduplication
+Drops syndicated copies by canonical URL and SimHash near-duplicate detection
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import List, Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+import numpy as np
+
+from .article import Article
+
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid", "cmpid", "ref", "src")
+BANDS = 8
+BAND_BITS = 64 // BANDS
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL so tracking variants of the same page compare equal"""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host.startswith("m."):
+        host = host[2:]
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return f"{host}{path}" + (f"?{urlencode(sorted(query))}" if query else "")
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """64-bit SimHash over word shingles"""
+    words = text.lower().split()
+    if not words:
+        return 0
+    if len(words) < shingle_size:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+
+    digests = b"".join(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest() for s in shingles)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(shingles)
+    packed = np.packbits(votes > 0)
+    return int.from_bytes(packed.tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _bands(value: int) -> Tuple[int, ...]:
+    mask = (1 << BAND_BITS) - 1
+    return tuple((value >> (i * BAND_BITS)) & mask for i in range(BANDS))
+
+
+def _signed(value: int) -> int:
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+class ArticleDeduplicator:
+    """Persistent cross-search duplicate index"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_distance: Optional[int] = None,
+        max_entries: Optional[int] = None
+    ):
+        self.path = path or os.getenv("DEDUP_INDEX_PATH", ".cache/dedup_index.sqlite")
+        # Hamming distance <= BANDS - 1 is guaranteed to share a band
+        self.max_distance = max_distance if max_distance is not None else int(os.getenv("DEDUP_MAX_DISTANCE", "6"))
+        if not 0 <= self.max_distance <= BANDS - 1:
+            clamped = min(max(self.max_distance, 0), BANDS - 1)
+            print(f"⚠️ DEDUP_MAX_DISTANCE must be 0-{BANDS - 1} for band lookups; using {clamped}")
+            self.max_distance = clamped
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("DEDUP_MAX_ENTRIES", "50000"))
+        self.dropped_url = 0
+        self.dropped_near = 0
+        self._lock = threading.Lock()
+
+        if self.path != ":memory:":
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS dedup_index (
+                url TEXT PRIMARY KEY,
+                hash INTEGER NOT NULL,
+                b0 INTEGER, b1 INTEGER, b2 INTEGER, b3 INTEGER,
+                b4 INTEGER, b5 INTEGER, b6 INTEGER, b7 INTEGER,
+                seen_at REAL NOT NULL
+            )
+        """)
+        for i in range(BANDS):
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_dedup_b{i} ON dedup_index (b{i})")
+        self._conn.commit()
+        print("✅ Deduplicator: Ready")
+
+    def filter(self, articles: List[Union[Article, Dict]]) -> List[Article]:
+        """
+        Return articles with URL and near-duplicate copies removed
+
+        Only copies of a story that is itself in this batch are dropped, so a
+        result set never loses a story. The persistent index remembers which
+        page represented each story, so later searches keep the same one.
+        """
+        articles = [Article.coerce(a) for a in articles]
+        urls = [canonical_url(a.url) for a in articles]
+        texts = [a.processed_text or a.title for a in articles]
+        hashes = [simhash(t) for t in texts]
+        batch = set(u for u in urls if u)
+        kept = []
+        batch_urls = set()
+        batch_hashes: List[Tuple[int, str]] = []
+        now = time.time()
+
+        with self._lock:
+            for article, url, text, value in zip(articles, urls, texts, hashes):
+                if url and url in batch_urls:
+                    self.dropped_url += 1
+                    continue
+
+                if not text.strip():
+                    kept.append(article)
+                    continue
+
+                # An earlier search kept another page for this story, and that page is here too
+                match = self._find_near(value)
+                if match is not None and match != url and match in batch:
+                    self.dropped_near += 1
+                    continue
+
+                if any(hamming(value, h) <= self.max_distance for h, _ in batch_hashes):
+                    self.dropped_near += 1
+                    continue
+
+                kept.append(article)
+                batch_hashes.append((value, url))
+                if url:
+                    batch_urls.add(url)
+                    if match is None:
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO dedup_index "
+                            "(url, hash, b0, b1, b2, b3, b4, b5, b6, b7, seen_at) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            (url, _signed(value), *_bands(value), now)
+                        )
+                    else:
+                        self._conn.execute("UPDATE dedup_index SET seen_at = ? WHERE url = ?", (now, match))
+
+            self._conn.execute(
+                "DELETE FROM dedup_index WHERE url IN ("
+                "SELECT url FROM dedup_index ORDER BY seen_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+        dropped = len(articles) - len(kept)
+        if dropped:
+            print(f"🧹 Dropped {dropped} duplicate articles")
+        return kept
+
+    def _find_near(self, value: int) -> Optional[str]:
+        """Canonical URL of an indexed near-duplicate, if any"""
+        bands = _bands(value)
+        rows = self._conn.execute(
+            "SELECT url, hash FROM dedup_index WHERE "
+            + " OR ".join(f"b{i} = ?" for i in range(BANDS)),
+            bands
+        ).fetchall()
+        best = None
+        best_distance = self.max_distance + 1
+        for url, stored in rows:
+            distance = hamming(value, stored & ((1 << 64) - 1))
+            if distance < best_distance:
+                best, best_distance = url, distance
+        return best
+
+    def stats(self) -> Dict:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM dedup_index").fetchone()[0]
+        return {
+            "dropped_url": self.dropped_url,
+            "dropped_near": self.dropped_near,
+            "indexed": size
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM dedup_index")
+            self._conn.commit()
@@ -0,0 +1,148 @@
+"""
+Dense Vector Index
+FAISS inner-product index over L2-normalized float32 embeddings, with a
+NumPy fallback when faiss is not installed.
+"""
+
+import os
+from typing import Tuple, Optional
+import numpy as np
+
+
+class DenseIndex:
+    """Cosine-similarity index (vectors must be L2-normalized)"""
+
+    def __init__(self, dim: int, kind: Optional[str] = None):
+        self.dim = dim
+        self.kind = (kind or os.getenv("DENSE_INDEX_TYPE", "flat")).lower()
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self._faiss = None
+        self._index = None
+        self._is_ivf = False
+
+        try:
+            import faiss
+            self._faiss = faiss
+        except ImportError:
+            print("⚠️ faiss not installed, using NumPy search")
+
+        self._build()
+
+    def _build(self):
+        self._is_ivf = False
+        if self._faiss is None:
+            return
+        faiss = self._faiss
+        if self.kind == "hnsw":
+            self._index = faiss.IndexHNSWFlat(self.dim, 32, faiss.METRIC_INNER_PRODUCT)
+            self._index.hnsw.efSearch = 64
+        elif self.kind == "ivf" and len(self.vectors) >= 1024:
+            nlist = int(np.sqrt(len(self.vectors)))
+            quantizer = faiss.IndexFlatIP(self.dim)
+            self._index = faiss.IndexIVFFlat(quantizer, self.dim, nlist, faiss.METRIC_INNER_PRODUCT)
+            self._index.train(self.vectors)
+            self._index.nprobe = max(1, nlist // 8)
+            self._is_ivf = True
+        else:
+            # IVF needs enough points to train; small corpora stay exact
+            self._index = faiss.IndexFlatIP(self.dim)
+        if len(self.vectors):
+            self._index.add(self.vectors)
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def reset(self, vectors: Optional[np.ndarray] = None):
+        """Replace all vectors"""
+        self.vectors = self._as_matrix(vectors) if vectors is not None else np.zeros((0, self.dim), dtype=np.float32)
+        self._build()
+
+    def add(self, vectors: np.ndarray):
+        """Append vectors; row ids continue from the current size"""
+        vectors = self._as_matrix(vectors)
+        self.vectors = np.vstack([self.vectors, vectors]) if len(self.vectors) else vectors
+        if self.kind == "ivf" and not self._is_ivf and len(self.vectors) >= 1024:
+            # Enough points to train the coarse quantizer now
+            self._build()
+        elif self._index is not None:
+            self._index.add(vectors)
+
+    def keep(self, mask: np.ndarray):
+        """Drop rows where mask is False (rebuilds the index)"""
+        self.reset(self.vectors[mask])
+
+    def search(self, query: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (scores, row ids) of the top_k most similar rows"""
+        n = len(self.vectors)
+        if n == 0:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+        k = min(top_k, n)
+        query = self._as_matrix(query)
+
+        if self._index is not None:
+            scores, ids = self._index.search(query, k)
+            valid = ids[0] >= 0
+            return scores[0][valid], ids[0][valid]
+
+        sims = self.vectors @ query[0]
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+        return sims[top], top
+
+    def memory_bytes(self) -> int:
+        # FAISS flat indexes hold their own copy of the vectors
+        copies = 2 if self._index is not None else 1
+        return self.vectors.nbytes * copies
+
+    @staticmethod
+    def _as_matrix(vectors: np.ndarray) -> np.ndarray:
+        return np.ascontiguousarray(np.atleast_2d(vectors), dtype=np.float32)
+
+
+class DenseDocumentIndex:
+    """Article-level wrapper pairing a DenseIndex with an embedding model"""
+
+    def __init__(self, embedder, kind: Optional[str] = None):
+        self.embedder = embedder
+        self.kind = kind
+        self.vectors = DenseIndex(embedder.dimension, kind)
+        self.docs = []
+
+    @property
+    def documents(self):
+        return list(self.docs)
+
+    def clear(self):
+        self.vectors = DenseIndex(self.embedder.dimension, self.kind)
+        self.docs = []
+
+    def add(self, docs, texts):
+        if not docs:
+            return
+        urls = {d.url for d in docs if d.url}
+        if urls and any(d.url in urls for d in self.docs):
+            self._keep([d.url not in urls for d in self.docs])
+        self.vectors.add(self.embedder.encode(texts))
+        self.docs.extend(docs)
+
+    def remove(self, url: str) -> int:
+        mask = [d.url != url for d in self.docs]
+        removed = mask.count(False)
+        if removed:
+            self._keep(mask)
+        return removed
+
+    def _keep(self, mask):
+        mask = np.asarray(mask, dtype=bool)
+        self.vectors.keep(mask)
+        self.docs = [d for d, keep in zip(self.docs, mask) if keep]
+
+    def search(self, query: str, top_k: int = 3):
+        if not self.docs:
+            return []
+        # Queries are one-off; only document vectors go into the persistent cache
+        _, ids = self.vectors.search(self.embedder.encode([query], persist=False), top_k)
+        return [self.docs[i] for i in ids]
+
+    def memory_bytes(self) -> int:
+        return self.vectors.memory_bytes()
@@ -0,0 +1,177 @@
+"""
+Embedding Cache
+Content-addressed store of embeddings: an append-only float32 matrix that is
+memory-mapped on load, plus a sidecar file of row keys.
+"""
+
+import os
+import re
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+
+def content_key(text: str, model_id: str) -> str:
+    """SHA-1 of the model id plus the exact text (cased models embed case)"""
+    return hashlib.sha1(f"{model_id}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Persistent text -> vector cache for one embedding model"""
+
+    def __init__(self, directory: str, model_id: str, dim: int, max_entries: Optional[int] = None):
+        self.model_id = model_id
+        self.dim = dim
+        self.max_entries = max_entries or int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+        slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_id)
+        self.directory = os.path.join(directory, slug)
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.vectors_path = os.path.join(self.directory, "vectors.f32")
+        self.keys_path = os.path.join(self.directory, "keys.txt")
+        self.lock_path = os.path.join(self.directory, ".lock")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+        self._matrix = None
+        self._signature = None
+        with self._file_lock():
+            self._load()
+
+    @contextmanager
+    def _file_lock(self):
+        """Serialize writers across processes sharing the cache directory"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _disk_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.keys_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_size)
+
+    def _load(self):
+        keys = []
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path, "r", encoding="ascii") as f:
+                keys = [line.strip() for line in f if line.strip()]
+
+        row_bytes = self.dim * 4
+        stored = os.path.getsize(self.vectors_path) // row_bytes if os.path.exists(self.vectors_path) else 0
+        # A crash between the two appends leaves them out of step; trust the shorter
+        n = min(len(keys), stored)
+        if stored > n:
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(n * row_bytes)
+        if len(keys) > n:
+            with open(self.keys_path, "w", encoding="ascii") as f:
+                f.write("".join(key + "\n" for key in keys[:n]))
+        self._rows = {key: i for i, key in enumerate(keys[:n])}
+        self._matrix = self._map(n)
+        self._signature = self._disk_signature()
+
+    def _map(self, n: int):
+        if n == 0:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        # Zero-copy view over the file; pages are loaded on demand
+        return np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(n, self.dim))
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def lookup(self, texts: List[str]) -> Tuple[List[str], Dict[int, np.ndarray]]:
+        """Return (keys, {position: vector}) for texts already cached"""
+        keys = [content_key(t, self.model_id) for t in texts]
+        found = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                row = self._rows.get(key)
+                if row is not None:
+                    found[i] = self._matrix[row]
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return keys, found
+
+    def store(self, keys: List[str], vectors: np.ndarray):
+        """Append new vectors (keys already present are skipped)"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock, self._file_lock():
+            # Another process may have appended or evicted since we last looked
+            if self._disk_signature() != self._signature:
+                self._load()
+
+            fresh = []
+            seen = set()
+            for i, key in enumerate(keys):
+                if key not in self._rows and key not in seen:
+                    fresh.append(i)
+                    seen.add(key)
+            if not fresh:
+                return
+
+            # Vectors first, then keys: a partial write is ignored on reload
+            with open(self.vectors_path, "ab") as f:
+                f.write(vectors[fresh].tobytes())
+            with open(self.keys_path, "a", encoding="ascii") as f:
+                f.write("".join(keys[i] + "\n" for i in fresh))
+
+            start = len(self._rows)
+            for offset, i in enumerate(fresh):
+                self._rows[keys[i]] = start + offset
+            if len(self._rows) > self.max_entries:
+                self._evict()
+            else:
+                self._matrix = self._map(len(self._rows))
+                self._signature = self._disk_signature()
+
+    def _evict(self):
+        """Drop the oldest rows down to 80% of the cap (caller holds both locks)"""
+        keep = int(self.max_entries * 0.8)
+        n = len(self._rows)
+        keys = [None] * n
+        for key, row in self._rows.items():
+            keys[row] = key
+        matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(n, self.dim))
+
+        vectors_tmp = self.vectors_path + ".tmp"
+        keys_tmp = self.keys_path + ".tmp"
+        with open(vectors_tmp, "wb") as f:
+            f.write(np.ascontiguousarray(matrix[n - keep:]).tobytes())
+        with open(keys_tmp, "w", encoding="ascii") as f:
+            f.write("".join(key + "\n" for key in keys[n - keep:]))
+        del matrix
+        # Readers keep their old mapping; replaced files are picked up on their next store
+        os.replace(vectors_tmp, self.vectors_path)
+        os.replace(keys_tmp, self.keys_path)
+
+        self.evictions += n - keep
+        self._rows = {key: i for i, key in enumerate(keys[n - keep:])}
+        self._matrix = self._map(keep)
+        self._signature = self._disk_signature()
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._rows),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0
+        }
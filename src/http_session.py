@@ -0,0 +1,157 @@
+"""
+Pooled HTTP Session
+Keep-alive session with retries, backoff and conditional requests
+"""
+
+import os
+import time
+import random
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class PooledSession:
+    """Long-lived requests session with bounded exponential backoff"""
+
+    def __init__(
+        self,
+        max_retries: Optional[int] = None,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 8.0,
+        pool_size: int = 10,
+        headers: Optional[Dict] = None
+    ):
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("HTTP_MAX_RETRIES", "3"))
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+        # ETag / Last-Modified validators and the response they belong to
+        self._validators: Dict[tuple, Dict] = {}
+        self._lock = threading.Lock()
+
+        self.latencies = deque(maxlen=500)
+        self.requests_sent = 0
+        self.retries = 0
+        self.not_modified = 0
+
+    def get(self, url: str, params: Optional[Dict] = None, timeout: float = 15) -> requests.Response:
+        """GET with retries on 429/5xx/connection errors"""
+        cache_key = (url, tuple(sorted((params or {}).items())))
+        headers = {}
+        with self._lock:
+            validator = self._validators.get(cache_key)
+        if validator:
+            if validator.get("etag"):
+                headers["If-None-Match"] = validator["etag"]
+            if validator.get("last_modified"):
+                headers["If-Modified-Since"] = validator["last_modified"]
+
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self._record(start)
+                if attempt >= self.max_retries:
+                    raise
+                self._sleep(attempt, None)
+                attempt += 1
+                continue
+
+            self._record(start)
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                self._sleep(attempt, response.headers.get("Retry-After"))
+                attempt += 1
+                continue
+
+            break
+
+        if response.status_code == 304 and validator:
+            self.not_modified += 1
+            return validator["response"]
+
+        if response.status_code == 200:
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                with self._lock:
+                    if len(self._validators) >= 256:
+                        self._validators.pop(next(iter(self._validators)))
+                    self._validators[cache_key] = {
+                        "etag": etag,
+                        "last_modified": last_modified,
+                        "response": response
+                    }
+
+        return response
+
+    def _record(self, start: float):
+        with self._lock:
+            self.requests_sent += 1
+            self.latencies.append(time.perf_counter() - start)
+
+    def _sleep(self, attempt: int, retry_after: Optional[str]):
+        """Full-jitter backoff, or the server's Retry-After when given"""
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+        delay = min(delay, self.backoff_cap)
+        with self._lock:
+            self.retries += 1
+        print(f"⏳ Retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+        time.sleep(delay)
+
+    def stats(self) -> Dict:
+        """Latency percentiles and retry counters"""
+        with self._lock:
+            samples = sorted(self.latencies)
+            requests_sent, retries, not_modified = self.requests_sent, self.retries, self.not_modified
+
+        def pct(p: float) -> float:
+            if not samples:
+                return 0.0
+            return samples[min(len(samples) - 1, int(p * len(samples)))] * 1000
+
+        return {
+            "requests": requests_sent,
+            "retries": retries,
+            "not_modified": not_modified,
+            "avg_ms": (sum(samples) / len(samples) * 1000) if samples else 0.0,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95)
+        }
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,146 @@
+"""
+Incremental TF-IDF Index
+HashingVectorizer segments with running document frequencies, so a rolling
+corpus can grow and shrink without refitting.
+"""
+
+from typing import List, Dict, Tuple
+import numpy as np
+
+from .article import Article
+
+
+class Segment:
+    """One batch of hashed documents; rows are tombstoned, never shifted"""
+
+    __slots__ = ("counts", "squares", "docs", "alive")
+
+    def __init__(self, counts, docs: List[Article], squares=None):
+        self.counts = counts
+        # Element-wise squares for row norms (snapshots pass a memory-mapped copy)
+        self.squares = counts.power(2) if squares is None else squares
+        self.docs = docs
+        self.alive = np.ones(len(docs), dtype=bool)
+
+
+class IncrementalIndex:
+    """Append-only segments + live document-frequency counts"""
+
+    def __init__(self, n_features: int = 2 ** 18, max_segments: int = 8):
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        self.n_features = n_features
+        self.max_segments = max_segments
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            stop_words='english',
+            ngram_range=(1, 2),
+            alternate_sign=False,
+            norm=None
+        )
+        self.clear()
+
+    def clear(self):
+        self.segments: List[Segment] = []
+        self.df = np.zeros(self.n_features, dtype=np.int64)
+        self.n_live = 0
+        self._url_rows: Dict[str, List[Tuple[Segment, int]]] = {}
+
+    @property
+    def documents(self) -> List[Article]:
+        return [doc for seg in self.segments for doc, alive in zip(seg.docs, seg.alive) if alive]
+
+    def add(self, docs: List[Article], texts: List[str]):
+        """Index a new batch as its own segment; re-added URLs replace older copies"""
+        if not docs:
+            return
+
+        for doc in docs:
+            if doc.url in self._url_rows:
+                self.remove(doc.url)
+
+        counts = self.vectorizer.transform(texts).astype(np.float32).tocsr()
+        counts.sum_duplicates()
+        segment = Segment(counts, docs)
+        self.segments.append(segment)
+        self.df += np.bincount(counts.indices, minlength=self.n_features)
+        self.n_live += len(docs)
+
+        for row, doc in enumerate(docs):
+            if doc.url:
+                self._url_rows.setdefault(doc.url, []).append((segment, row))
+
+        if len(self.segments) > self.max_segments:
+            self.compact()
+
+    def remove(self, url: str) -> int:
+        """Tombstone every row with this URL; returns how many were removed"""
+        removed = 0
+        for segment, row in self._url_rows.pop(url, []):
+            if not segment.alive[row]:
+                continue
+            segment.alive[row] = False
+            start, end = segment.counts.indptr[row], segment.counts.indptr[row + 1]
+            self.df[segment.counts.indices[start:end]] -= 1
+            removed += 1
+        self.n_live -= removed
+        return removed
+
+    def compact(self):
+        """Merge all segments into one, dropping tombstoned rows"""
+        import scipy.sparse as sp
+
+        live = [(seg.counts[seg.alive], [d for d, a in zip(seg.docs, seg.alive) if a]) for seg in self.segments]
+        live = [(counts, docs) for counts, docs in live if docs]
+        self.segments = []
+        self._url_rows = {}
+        if not live:
+            return
+
+        merged = Segment(sp.vstack([c for c, _ in live]).tocsr(), [d for _, docs in live for d in docs])
+        self.segments.append(merged)
+        for row, doc in enumerate(merged.docs):
+            if doc.url:
+                self._url_rows.setdefault(doc.url, []).append((merged, row))
+
+    def memory_bytes(self) -> int:
+        total = self.df.nbytes
+        for seg in self.segments:
+            for matrix in (seg.counts, seg.squares):
+                total += matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+        return total
+
+    def idf(self) -> np.ndarray:
+        # Same smoothing as sklearn's TfidfTransformer
+        return (np.log((1 + self.n_live) / (1 + self.df)) + 1).astype(np.float32)
+
+    def search(self, query: str, top_k: int = 3) -> List[Article]:
+        """Cosine similarity over all live rows, merged across segments"""
+        if not self.n_live:
+            return []
+
+        idf = self.idf()
+        q = self.vectorizer.transform([query]).astype(np.float32).toarray().ravel() * idf
+        q_norm = np.linalg.norm(q)
+        if q_norm == 0:
+            return []
+        q /= q_norm
+        q_weighted = q * idf
+        idf_sq = idf * idf
+
+        all_scores = []
+        all_docs = []
+        for seg in self.segments:
+            dots = seg.counts @ q_weighted
+            norms = np.sqrt(seg.squares @ idf_sq)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                sims = np.where(norms > 0, dots / norms, 0.0)
+            sims[~seg.alive] = -np.inf
+            all_scores.append(sims)
+            all_docs.extend(seg.docs)
+
+        scores = np.concatenate(all_scores)
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [all_docs[i] for i in top if np.isfinite(scores[i])]
@@ -0,0 +1,165 @@
+"""
+Structured Insight Schema & Store
+Validates JSON investment insights and persists them per (company, article
+fingerprint), so repeat views and comparisons don't call the LLM again
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import List, Dict, Optional, Tuple
+
+SENTIMENTS = ("BULLISH", "BEARISH", "NEUTRAL")
+RECOMMENDATIONS = ("BUY", "HOLD", "SELL")
+
+# field -> (type, constraint)
+INSIGHT_SCHEMA = {
+    "sentiment": ("enum", SENTIMENTS),
+    "key_points": ("list", (1, 5)),
+    "catalysts": ("list", (0, 5)),
+    "risks": ("list", (0, 5)),
+    "recommendation": ("enum", RECOMMENDATIONS),
+    "rationale": ("str", 400),
+    "confidence": ("number", (0.0, 1.0))
+}
+
+SCHEMA_PROMPT = """{
+  "sentiment": "BULLISH" | "BEARISH" | "NEUTRAL",
+  "key_points": [1-5 short strings],
+  "catalysts": [0-5 short strings],
+  "risks": [0-5 short strings],
+  "recommendation": "BUY" | "HOLD" | "SELL",
+  "rationale": "one sentence",
+  "confidence": number between 0 and 1
+}"""
+
+
+def parse_json_object(text: str) -> Optional[Dict]:
+    """First JSON object in an LLM reply (tolerates ```json fences and chatter)"""
+    if not text:
+        return None
+    start = text.find("{")
+    end = text.rfind("}")
+    if start < 0 or end <= start:
+        return None
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def validate_insight(data: Optional[Dict]) -> Tuple[Optional[Dict], List[str]]:
+    """Return (normalized insight, errors); normalization uppercases enums and trims lists"""
+    if data is None:
+        return None, ["reply is not a JSON object"]
+
+    errors = []
+    clean = {}
+    for field, (kind, rule) in INSIGHT_SCHEMA.items():
+        value = data.get(field)
+        if value is None:
+            errors.append(f"missing field '{field}'")
+            continue
+        if kind == "enum":
+            value = str(value).strip().upper()
+            if value not in rule:
+                errors.append(f"'{field}' must be one of {', '.join(rule)}")
+                continue
+        elif kind == "list":
+            if not isinstance(value, list):
+                errors.append(f"'{field}' must be a list of strings")
+                continue
+            value = [str(v).strip() for v in value if str(v).strip()]
+            if len(value) < rule[0]:
+                errors.append(f"'{field}' needs at least {rule[0]} item(s)")
+                continue
+            value = value[:rule[1]]
+        elif kind == "str":
+            value = str(value).strip()[:rule]
+        elif kind == "number":
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                errors.append(f"'{field}' must be a number")
+                continue
+            if not rule[0] <= value <= rule[1]:
+                errors.append(f"'{field}' must be between {rule[0]:g} and {rule[1]:g}")
+                continue
+        clean[field] = value
+
+    return (None if errors else clean), errors
+
+
+class InsightStore:
+    """SQLite table of validated insights keyed by company + article fingerprint"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("INSIGHT_STORE_PATH", ".cache/insights.sqlite")
+        self._lock = threading.Lock()
+
+        if self.path != ":memory:":
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS insights (
+                company TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                provider TEXT,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (company, fingerprint)
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_insights_company ON insights (company, created_at)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _company(company: str) -> str:
+        return " ".join(company.lower().split())
+
+    def get(self, company: str, fingerprint: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM insights WHERE company = ? AND fingerprint = ?",
+                (self._company(company), fingerprint)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, company: str, fingerprint: str, insight: Dict, provider: str = ""):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO insights (company, fingerprint, provider, payload, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self._company(company), fingerprint, provider, json.dumps(insight), time.time())
+            )
+            self._conn.commit()
+
+    def history(self, company: str, limit: int = 20) -> List[Dict]:
+        """Stored insights for a company, newest first, with provenance"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT fingerprint, provider, payload, created_at FROM insights "
+                "WHERE company = ? ORDER BY created_at DESC LIMIT ?",
+                (self._company(company), limit)
+            ).fetchall()
+        return [
+            {"fingerprint": fp, "provider": provider, "created_at": created_at, **json.loads(payload)}
+            for fp, provider, payload, created_at in rows
+        ]
+
+    def latest(self, companies: List[str]) -> Dict[str, Dict]:
+        """Most recent insight per company, for side-by-side comparisons"""
+        result = {}
+        for company in companies:
+            history = self.history(company, limit=1)
+            if history:
+                result[company] = history[0]
+        return result
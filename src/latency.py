@@ -0,0 +1,59 @@
+"""
+Latency Histograms
+Fixed-bucket histogram plus a rolling sample window for percentiles
+"""
+
+import bisect
+import threading
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+# Upper bounds in seconds; the last bucket catches everything slower
+BUCKETS: Tuple[float, ...] = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0)
+
+
+class LatencyHistogram:
+    """Thread-safe latency recorder for one upstream (e.g. an LLM provider)"""
+
+    def __init__(self, window: int = 200, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.samples = deque(maxlen=window)
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.samples.append(seconds)
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Seconds at quantile `p` of the recent window; None with no samples"""
+        with self._lock:
+            samples = sorted(self.samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+    def stats(self) -> Dict:
+        """Counts per bucket (keyed by upper bound in ms) and recent percentiles"""
+        p50, p95 = self.percentile(0.50), self.percentile(0.95)
+        with self._lock:
+            counts = list(self.counts)
+            errors = self.errors
+        labels = [f"≤{int(b * 1000)}ms" for b in self.buckets] + [f">{int(self.buckets[-1] * 1000)}ms"]
+        return {
+            "count": sum(counts),
+            "errors": errors,
+            "p50_ms": p50 * 1000 if p50 is not None else 0.0,
+            "p95_ms": p95 * 1000 if p95 is not None else 0.0,
+            "buckets": dict(zip(labels, counts))
+        }
@@ -4,27 +4,69 @@ Fast LLM Router
 """
 
 import os
-from typing import Optional, List
+import time
+import asyncio
+import threading
+from typing import Optional, List, Dict, Iterator, Callable
+import numpy as np
 from dotenv import load_dotenv
 
+from .latency import LatencyHistogram
+from .circuit_breaker import CircuitBreaker
+from .signals import SignalScorer, FACT_PATTERN
+from .tokens import count_tokens, split_sentences
+
 load_dotenv()
 
+GROQ_MODEL = "llama-3.1-8b-instant"
+OPENAI_MODEL = "gpt-3.5-turbo"
+
+# Context windows; prompts are budgeted so input + max_tokens always fits
+MODEL_CONTEXT_TOKENS = {
+    GROQ_MODEL: int(os.getenv("GROQ_CONTEXT_TOKENS", "8192")),
+    OPENAI_MODEL: int(os.getenv("OPENAI_CONTEXT_TOKENS", "16385"))
+}
+
 
 class LLMRouter:
     """Fast LLM Router"""
     
     def __init__(self):
+        self._thread = threading.local()
         self.current_provider = None
-        self.failed_providers = set()
         self._groq_client = None
         self._openai_client = None
+        self._async_clients = {}
+        self.cache = None
+        self._scorer = None
+        
+        # Client-side timeouts bound how long a hanging provider can stall a request
+        self.timeouts = {
+            "Groq": float(os.getenv("GROQ_TIMEOUT", "15")),
+            "OpenAI": float(os.getenv("OPENAI_TIMEOUT", "30"))
+        }
+        self.latency = {"Groq": LatencyHistogram(), "OpenAI": LatencyHistogram()}
+        # Sick providers are skipped until a recovery probe succeeds
+        self.breakers = {"Groq": CircuitBreaker("Groq"), "OpenAI": CircuitBreaker("OpenAI")}
+        
+        # Hedging (async path): fire the backup once the primary exceeds its p95
+        self.hedge = os.getenv("LLM_HEDGE", "0") == "1"
+        self.hedge_delay = float(os.getenv("LLM_HEDGE_DELAY", "2.0"))
+        self.hedges = 0
+        self.hedge_wins = 0
+        
+        # Tokens in/out per provider (API-reported when available, else counted locally)
+        self.usage = {name: {"calls": 0, "tokens_in": 0, "tokens_out": 0} for name in ("Groq", "OpenAI")}
+        self.last_usage: Dict = {}
+        self._usage_lock = threading.Lock()
         
         # Initialize Groq (primary)
         groq_key = os.getenv("GROQ_API_KEY")
         if groq_key:
             try:
-                from groq import Groq
-                self._groq_client = Groq(api_key=groq_key)
+                from groq import Groq, AsyncGroq
+                self._groq_client = Groq(api_key=groq_key, timeout=self.timeouts["Groq"])
+                self._async_clients["Groq"] = AsyncGroq(api_key=groq_key, timeout=self.timeouts["Groq"])
                 print("   ✅ Groq ready")
             except Exception as e:
                 print(f"   ❌ Groq: {e}")
@@ -33,105 +75,519 @@ class LLMRouter:
         openai_key = os.getenv("OPENAI_API_KEY")
         if openai_key:
             try:
-                from openai import OpenAI
-                self._openai_client = OpenAI(api_key=openai_key)
+                from openai import OpenAI, AsyncOpenAI
+                self._openai_client = OpenAI(api_key=openai_key, timeout=self.timeouts["OpenAI"])
+                self._async_clients["OpenAI"] = AsyncOpenAI(api_key=openai_key, timeout=self.timeouts["OpenAI"])
                 print("   ✅ OpenAI ready")
             except Exception as e:
                 print(f"   ❌ OpenAI: {e}")
         
+        # Identical (and near-identical) requests reuse earlier completions
+        if os.getenv("LLM_CACHE", "1") == "1":
+            try:
+                from .response_cache import ResponseCache
+                self.cache = ResponseCache()
+                print("   ✅ LLM cache ready")
+            except Exception as e:
+                print(f"   ⚠️ LLM cache disabled: {e}")
+        
         print(f"✅ LLM Router ready")
     
-    def generate(self, prompt: str, system_prompt: str = "", max_tokens: int = 300, temperature: float = 0.3) -> str:
-        """Generate response quickly"""
+    @property
+    def current_provider(self) -> Optional[str]:
+        return self._current_provider
+    
+    @current_provider.setter
+    def current_provider(self, name: Optional[str]):
+        # Also tracked per thread, so concurrent callers can tell who answered them
+        self._current_provider = name
+        self._thread.provider = name
+    
+    def last_provider(self) -> str:
+        """Provider that served this thread's most recent request"""
+        return getattr(self._thread, "provider", None) or ""
+    
+    def has_providers(self) -> bool:
+        """True if any LLM provider is configured and not circuit-broken"""
+        return bool(self._providers())
+    
+    def is_configured(self) -> bool:
+        """True if any provider has a client, even one whose breaker is open (its cache still serves)"""
+        return bool(self._configured())
+    
+    def _providers(self):
+        """(name, model, client, call) for each usable provider, in failover order"""
+        return [p for p in self._configured() if self.breakers[p[0]].available()]
+    
+    def _configured(self):
+        """Every provider with a client, whatever its breaker state"""
+        providers = []
+        if self._groq_client:
+            providers.append(("Groq", GROQ_MODEL, self._groq_client, self._call_groq))
+        if self._openai_client:
+            providers.append(("OpenAI", OPENAI_MODEL, self._openai_client, self._call_openai))
+        return providers
+    
+    def generate(
+        self,
+        prompt: str,
+        system_prompt: str = "",
+        max_tokens: int = 300,
+        temperature: float = 0.3,
+        cache_scope: Optional[str] = None,
+        cache_query: Optional[str] = None,
+        validate: Optional[Callable[[str], bool]] = None
+    ) -> str:
+        """
+        Generate response quickly
+        cache_scope/cache_query (e.g. article fingerprint + question) enable semantic cache reuse
+        Replies failing `validate` are returned but neither cached nor served from the cache
+        """
+        providers = self._providers()
+        cached = self._cache_lookup(prompt, system_prompt, max_tokens, temperature, cache_scope, cache_query)
+        if cached is not None and (validate is None or validate(cached)):
+            return cached
         
-        # Try Groq first (fastest)
-        if self._groq_client and "Groq" not in self.failed_providers:
+        # Groq first (fastest), then OpenAI
+        for name, model, _, call in providers:
+            permit = self.breakers[name].allow()
+            if not permit:
+                continue
+            start = time.perf_counter()
             try:
-                return self._call_groq(prompt, system_prompt, max_tokens, temperature)
+                response = call(prompt, system_prompt, max_tokens, temperature)
             except Exception as e:
-                print(f"⚠️ Groq: {str(e)[:50]}")
-                if "quota" in str(e).lower():
-                    self.failed_providers.add("Groq")
+                self._record_failure(name, e, permit)
+                continue
+            self._record_success(name, time.perf_counter() - start, permit)
+            
+            if validate is None or validate(response):
+                self._cache_store(name, model, prompt, system_prompt, max_tokens, temperature, response, cache_scope, cache_query)
+            return response
+        
+        # Local fallback
+        return self._local_fallback(prompt)
+    
+    async def agenerate(
+        self,
+        prompt: str,
+        system_prompt: str = "",
+        max_tokens: int = 300,
+        temperature: float = 0.3,
+        cache_scope: Optional[str] = None,
+        cache_query: Optional[str] = None,
+        hedge: Optional[bool] = None
+    ) -> str:
+        """
+        Async generate with per-provider timeouts
+        With hedging, the backup is started once the primary runs past its p95 and the first good answer wins
+        """
+        providers = [p for p in self._providers() if p[0] in self._async_clients]
+        cached = self._cache_lookup(prompt, system_prompt, max_tokens, temperature, cache_scope, cache_query)
+        if cached is not None:
+            return cached
+        
+        request = (prompt, system_prompt, max_tokens, temperature)
+        hedge = self.hedge if hedge is None else hedge
+        if hedge and len(providers) > 1:
+            result = await self._hedged(providers[0], providers[1], request)
+            providers = providers[2:]
+            if result is not None:
+                name, model, response = result
+                self._cache_store(name, model, *request, response, cache_scope, cache_query)
+                return response
         
-        # Try OpenAI
-        if self._openai_client and "OpenAI" not in self.failed_providers:
+        for provider in providers:
+            permit = self.breakers[provider[0]].allow()
+            if not permit:
+                continue
             try:
-                return self._call_openai(prompt, system_prompt, max_tokens, temperature)
+                name, model, response = await self._acall(provider, request, permit)
             except Exception as e:
-                print(f"⚠️ OpenAI: {str(e)[:50]}")
-                if "quota" in str(e).lower():
-                    self.failed_providers.add("OpenAI")
+                self._record_failure(provider[0], e, permit)
+                continue
+            self._cache_store(name, model, *request, response, cache_scope, cache_query)
+            return response
         
-        # Local fallback
         return self._local_fallback(prompt)
     
-    def _call_groq(self, prompt: str, system_prompt: str, max_tokens: int, temperature: float) -> str:
-        """Fast Groq call"""
+    async def _acall(self, provider, request, permit):
+        """One async completion, bounded by the provider's timeout"""
+        name, model = provider[0], provider[1]
+        prompt, system_prompt, max_tokens, temperature = request
+        start = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(
+                self._async_clients[name].chat.completions.create(
+                    model=model,
+                    messages=self._messages(prompt, system_prompt),
+                    max_tokens=max_tokens,
+                    temperature=temperature
+                ),
+                timeout=self.timeouts[name]
+            )
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"no response within {self.timeouts[name]:g}s")
+        except asyncio.CancelledError:
+            # Lost a hedge race; not a failure, but free the probe slot if it held one
+            self.breakers[name].release(permit)
+            raise
+        self._record_success(name, time.perf_counter() - start, permit)
+        self.current_provider = name
+        content = response.choices[0].message.content
+        self._record_usage(name, self._messages(prompt, system_prompt), content, getattr(response, "usage", None))
+        return name, model, content
+    
+    async def _hedged(self, primary, backup, request):
+        """Race primary against a delayed backup; returns (name, model, response) or None"""
+        tasks = {}
+        permits = {}
+        
+        def launch(provider) -> bool:
+            permit = self.breakers[provider[0]].allow()
+            if not permit:
+                return False
+            task = asyncio.ensure_future(self._acall(provider, request, permit))
+            tasks[task] = provider
+            permits[task] = permit
+            return True
+        
+        # With the primary's breaker closed to us, the backup simply runs alone
+        backup_started = not launch(primary)
+        if backup_started and not launch(backup):
+            return None
+        pending = set(tasks)
+        hedged = False
+        try:
+            while pending:
+                delay = None if backup_started else self._hedge_delay(primary[0])
+                done, pending = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Primary is slower than usual: hedge
+                    backup_started = True
+                    if launch(backup):
+                        self.hedges += 1
+                        hedged = True
+                        pending = {t for t in tasks if not t.done()}
+                    continue
+                
+                for task in done:
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        self._record_failure(tasks[task][0], e, permits[task])
+                        continue
+                    if tasks[task] is backup and hedged:
+                        self.hedge_wins += 1
+                    return result
+                
+                if not backup_started:
+                    # Primary failed outright; fall straight through to the backup
+                    backup_started = True
+                    launch(backup)
+                    pending = {t for t in tasks if not t.done()}
+        finally:
+            for task in pending:
+                task.cancel()
+        return None
+    
+    def _hedge_delay(self, name: str) -> float:
+        """Primary's recent p95, or LLM_HEDGE_DELAY until there are enough samples"""
+        histogram = self.latency[name]
+        if len(histogram.samples) < 5:
+            return self.hedge_delay
+        return min(max(histogram.percentile(0.95), 0.05), self.timeouts[name])
+    
+    def latency_stats(self) -> Dict:
+        """Per-provider latency histograms plus hedging counters"""
+        stats = {name: h.stats() for name, h in self.latency.items()}
+        stats["hedging"] = {"enabled": self.hedge, "hedges": self.hedges, "backup_wins": self.hedge_wins}
+        return stats
+    
+    def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: str = "",
+        max_tokens: int = 300,
+        temperature: float = 0.3,
+        cache_scope: Optional[str] = None,
+        cache_query: Optional[str] = None,
+        fallback: Optional[Callable[[], str]] = None
+    ) -> Iterator[str]:
+        """
+        Yield the response incrementally
+        Fails over like generate(), but only until a provider has produced its first token
+        `fallback` produces the local answer (default: key sentences from the prompt); it also
+        completes a stream that breaks off midway
+        """
+        providers = self._providers()
+        cached = self._cache_lookup(prompt, system_prompt, max_tokens, temperature, cache_scope, cache_query)
+        if cached is not None:
+            yield cached
+            return
+        
+        for name, model, client, _ in providers:
+            permit = self.breakers[name].allow()
+            if not permit:
+                continue
+            start = time.perf_counter()
+            chunks = self._stream_chat(client, model, prompt, system_prompt, max_tokens, temperature)
+            try:
+                first = next(chunks, "")
+                if not first:
+                    raise RuntimeError("empty response")
+            except Exception as e:
+                # Nothing reached the caller yet, so the next provider can still answer
+                self._record_failure(name, e, permit)
+                continue
+            # Time to first token is what the breaker judges for streams
+            self.breakers[name].record_success(permit, time.perf_counter() - start)
+            
+            # Committed to this provider from here on
+            self.current_provider = name
+            parts = [first]
+            yield first
+            try:
+                for chunk in chunks:
+                    parts.append(chunk)
+                    yield chunk
+            except Exception as e:
+                self._record_failure(name, e, permit)
+                print(f"⚠️ {name} stream interrupted")
+                yield " …"
+                if fallback is not None:
+                    yield "\n\n---\n\n" + fallback()
+                return
+            
+            # Histograms track full completion time, like the non-streaming calls
+            self.latency[name].observe(time.perf_counter() - start)
+            self._record_usage(name, self._messages(prompt, system_prompt), "".join(parts))
+            self._cache_store(name, model, prompt, system_prompt, max_tokens, temperature, "".join(parts), cache_scope, cache_query)
+            return
+        
+        yield fallback() if fallback is not None else self._local_fallback(prompt)
+    
+    def _stream_chat(self, client, model: str, prompt: str, system_prompt: str, max_tokens: int, temperature: float) -> Iterator[str]:
+        """Text deltas from a streaming chat completion (Groq and OpenAI share the API shape)"""
+        stream = client.chat.completions.create(
+            model=model,
+            messages=self._messages(prompt, system_prompt),
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    @staticmethod
+    def _messages(prompt: str, system_prompt: str) -> List[Dict]:
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
+        return messages
+    
+    def _record_usage(self, name: str, messages: List[Dict], output: str, usage=None):
+        tokens_in = getattr(usage, "prompt_tokens", None) or sum(count_tokens(m["content"]) + 4 for m in messages)
+        tokens_out = getattr(usage, "completion_tokens", None) or count_tokens(output or "")
+        with self._usage_lock:
+            totals = self.usage[name]
+            totals["calls"] += 1
+            totals["tokens_in"] += tokens_in
+            totals["tokens_out"] += tokens_out
+            self.last_usage = {"provider": name, "tokens_in": tokens_in, "tokens_out": tokens_out}
+        print(f"📏 {name}: {tokens_in} tokens in / {tokens_out} out")
+    
+    def input_budget(self, max_tokens: int, requested: int) -> int:
+        """`requested` input tokens, capped so any usable provider can still fit max_tokens of output"""
+        models = [model for _, model, _, _ in self._providers()]
+        if not models:
+            return requested
+        window = min(MODEL_CONTEXT_TOKENS.get(m, 4096) for m in models)
+        return max(0, min(requested, window - max_tokens))
+    
+    def usage_stats(self) -> Dict:
+        """Cumulative tokens in/out per provider"""
+        with self._usage_lock:
+            return {name: dict(totals) for name, totals in self.usage.items() if totals["calls"]}
+    
+    def _record_success(self, name: str, seconds: float, permit):
+        self.latency[name].observe(seconds)
+        self.breakers[name].record_success(permit, seconds)
+    
+    def _record_failure(self, name: str, error: Exception, permit):
+        self.latency[name].record_error()
+        print(f"⚠️ {name}: {str(error)[:50]}")
+        # Exhausted quota will not recover on the next request: open immediately
+        self.breakers[name].record_failure(permit, fatal="quota" in str(error).lower())
+    
+    def _cache_lookup(self, prompt, system_prompt, max_tokens, temperature, scope, query) -> Optional[str]:
+        configured = self._configured()
+        if self.cache is None or not configured:
+            return None
+        # Open breakers don't matter here: a cached answer is most useful when providers are down
+        for name, model, _, _ in configured:
+            family = self.cache.family_key(name, model, system_prompt, max_tokens, temperature)
+            hit = self.cache.get(family, prompt, scope, query)
+            if hit is not None:
+                self.current_provider = f"{hit[0]} (cached)"
+                return hit[1]
+        self.cache.record_miss()
+        return None
+    
+    def _cache_store(self, name, model, prompt, system_prompt, max_tokens, temperature, response, scope, query):
+        if self.cache is not None and response:
+            family = self.cache.family_key(name, model, system_prompt, max_tokens, temperature)
+            self.cache.set(family, prompt, name, response, scope, query)
+    
+    def cache_stats(self) -> Dict:
+        """LLM response cache counters (empty when caching is off)"""
+        return self.cache.stats() if self.cache is not None else {}
+    
+    def _call_groq(self, prompt: str, system_prompt: str, max_tokens: int, temperature: float) -> str:
+        """Fast Groq call"""
+        messages = self._messages(prompt, system_prompt)
         
         # Use fastest model
         response = self._groq_client.chat.completions.create(
-            model="llama-3.1-8b-instant",  # Fastest
+            model=GROQ_MODEL,  # Fastest
             messages=messages,
             max_tokens=max_tokens,
             temperature=temperature
         )
         
         self.current_provider = "Groq"
-        return response.choices[0].message.content
+        content = response.choices[0].message.content
+        self._record_usage("Groq", messages, content, getattr(response, "usage", None))
+        return content
     
     def _call_openai(self, prompt: str, system_prompt: str, max_tokens: int, temperature: float) -> str:
         """OpenAI call"""
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        messages.append({"role": "user", "content": prompt})
+        messages = self._messages(prompt, system_prompt)
         
         response = self._openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
+            model=OPENAI_MODEL,
             messages=messages,
             max_tokens=max_tokens,
             temperature=temperature
         )
         
         self.current_provider = "OpenAI"
-        return response.choices[0].message.content
+        content = response.choices[0].message.content
+        self._record_usage("OpenAI", messages, content, getattr(response, "usage", None))
+        return content
     
     def _local_fallback(self, prompt: str) -> str:
-        """Extract key info locally"""
+        """Extract key info locally: sentences with figures or strong lexicon tone"""
         self.current_provider = "Local"
+        if self._scorer is None:
+            self._scorer = SignalScorer()
         
-        lines = prompt.split('\n')
-        keywords = ['revenue', 'profit', 'growth', 'analyst', 'upgrade', 'downgrade', 
-                   'buy', 'sell', 'hold', 'bullish', 'bearish', 'billion', 'million', '%']
+        sentences = [s for line in prompt.split('\n') for s in split_sentences(line.strip()) if len(s) > 30]
+        if sentences:
+            relevance = np.abs(self._scorer.score_texts(sentences))
+            relevance += np.array([1.0 if FACT_PATTERN.search(s) else 0.0 for s in sentences])
+            ranked = [i for i in np.argsort(-relevance, kind="stable") if relevance[i] > 0][:4]
+            if ranked:
+                return "**Key Points:**\n\n• " + "\n• ".join(sentences[i] for i in sorted(ranked))
         
-        relevant = []
-        for line in lines:
-            line = line.strip()
-            if len(line) > 30 and any(k in line.lower() for k in keywords):
-                relevant.append(line)
-        
-        if relevant:
-            return "**Key Points:**\n\n• " + "\n• ".join(relevant[:4])
         return "Please check your API keys for AI analysis."
     
     def get_current_provider(self) -> str:
         return self.current_provider or ""
     
+    def provider_status(self) -> Dict:
+        """Circuit breaker state for each configured provider"""
+        configured = {"Groq": self._groq_client, "OpenAI": self._openai_client}
+        return {name: self.breakers[name].stats() for name, client in configured.items() if client}
+    
     def reset_failed_providers(self):
-        self.failed_providers = set()
+        """Close every circuit breaker"""
+        for breaker in self.breakers.values():
+            breaker.reset()
 
 
 class EmbeddingRouter:
-    def __init__(self):
+    """Chooses TF-IDF or a local sentence-transformers model for retrieval"""
+    
+    def __init__(self, backend: Optional[str] = None, model_name: Optional[str] = None):
+        self.backend = (backend or os.getenv("EMBEDDING_BACKEND", "tfidf")).lower()
+        self.model_name = model_name or os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+        self.batch_size = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+        self.model = None
+        self.cache = None
         self.use_tfidf = True
-        print("✅ Embeddings: TF-IDF")
+        
+        if self.backend == "dense":
+            try:
+                from sentence_transformers import SentenceTransformer
+                self.model = SentenceTransformer(self.model_name, device="cpu")
+                self.use_tfidf = False
+                print(f"✅ Embeddings: {self.model_name}")
+            except Exception as e:
+                print(f"⚠️ Embeddings: {e} - falling back to TF-IDF")
+        
+        cache_dir = os.getenv("EMBEDDING_CACHE_DIR", ".cache/embeddings")
+        if self.model and cache_dir:
+            try:
+                from .embedding_cache import EmbeddingCache
+                self.cache = EmbeddingCache(cache_dir, self.model_name, self.dimension)
+                print(f"   ✅ Embedding cache: {len(self.cache)} vectors")
+            except Exception as e:
+                print(f"   ⚠️ Embedding cache disabled: {e}")
+        
+        if self.use_tfidf:
+            print("✅ Embeddings: TF-IDF")
+    
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension() if self.model else 0
+    
+    def encode(self, texts: List[str], persist: bool = True) -> np.ndarray:
+        """
+        Batch-encode texts to L2-normalized float32 vectors, reusing cached ones
+        persist=False still reads the cache but does not store (one-off queries)
+        """
+        if not self.model:
+            raise RuntimeError("Dense embeddings are not enabled")
+        if self.cache is None:
+            return self._encode(texts)
+        
+        keys, found = self.cache.lookup(texts)
+        result = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for i, vector in found.items():
+            result[i] = vector
+        
+        # Encode each unseen text once, even if repeated in the batch
+        missing = {}
+        for i, key in enumerate(keys):
+            if i not in found:
+                missing.setdefault(key, []).append(i)
+        if missing:
+            first = [positions[0] for positions in missing.values()]
+            vectors = self._encode([texts[i] for i in first])
+            for vector, positions in zip(vectors, missing.values()):
+                result[positions] = vector
+            if persist:
+                self.cache.store(list(missing), vectors)
+        
+        return result
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        return np.asarray(vectors, dtype=np.float32)
     
     def get_embedding(self, text: str) -> Optional[List[float]]:
-        return None
+        if not self.model:
+            return None
+        return self.encode([text])[0].tolist()
     
     def should_use_tfidf(self) -> bool:
-        return True
\ No newline at end of file
+        return self.use_tfidf
@@ -0,0 +1,119 @@
+"""
+News Response Cache
+SQLite-backed cache for NewsAPI results with TTL and LRU eviction
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+from typing import List, Dict, Optional
+
+
+class NewsCache:
+    """Persistent on-disk cache for fetched news articles"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_seconds: Optional[int] = None,
+        max_entries: Optional[int] = None
+    ):
+        self.path = path or os.getenv("NEWS_CACHE_PATH", ".cache/news_cache.sqlite")
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else int(os.getenv("NEWS_CACHE_TTL", "900"))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("NEWS_CACHE_MAX_ENTRIES", "500"))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if self.path != ":memory:":
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        # Streamlit serves sessions from several threads
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS news_cache (
+                key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_news_cache_accessed ON news_cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    def make_key(self, query: str, days: int, max_articles: int) -> str:
+        """Build a normalized cache key; the date bucket rolls over daily"""
+        normalized = " ".join(query.lower().split())
+        bucket = datetime.now().strftime("%Y-%m-%d")
+        raw = json.dumps([normalized, int(days), int(max_articles), bucket])
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """Return cached articles, or None on miss/expiry"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM news_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            payload, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM news_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE news_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(payload)
+
+    def set(self, key: str, articles: List[Dict]):
+        """Store articles and evict least recently used entries over the limit"""
+        now = time.time()
+        payload = json.dumps(articles)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO news_cache (key, payload, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, payload, now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM news_cache WHERE key IN ("
+                "SELECT key FROM news_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._conn.execute("DELETE FROM news_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM news_cache").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": size
+        }
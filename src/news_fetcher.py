@@ -6,24 +6,52 @@ Fetches actual financial news from NewsAPI
 
 import os
 import re
+import random
+import asyncio
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Tuple, Optional, Iterator, AsyncIterator, Union
 from dotenv import load_dotenv
 
+from .article import Article, parse_date
+from .news_cache import NewsCache
+from .http_session import PooledSession, RETRY_STATUSES, parse_retry_after
+from .rate_limiter import TokenBucket
+
 load_dotenv()
 
+TRUNCATION_MARKER = re.compile(r'\[\+\d+ chars\]')
+
 
 class NewsFetcher:
     """Fetches real financial news from NewsAPI"""
     
     def __init__(self):
         self.api_key = os.getenv("NEWS_API_KEY")
-        self.base_url = "https://newsapi.org/v2/everything"
+        self.base_url = os.getenv("NEWS_API_URL", "https://newsapi.org/v2/everything")
         
         if not self.api_key:
             raise ValueError("❌ NEWS_API_KEY not found in .env file!")
         
+        # One keep-alive session for the lifetime of the (cached) fetcher
+        self.http = PooledSession(headers={"X-Api-Key": self.api_key})
+        
+        self.cache = None
+        try:
+            self.cache = NewsCache()
+        except Exception as e:
+            print(f"⚠️ News cache disabled: {e}")
+        
+        # Speculative mode issues the broad fallback alongside the strict query
+        self.speculative = os.getenv("NEWS_SPECULATIVE", "0") == "1"
+        # The broad request waits this long, so a fast strict hit cancels it unsent
+        self.speculative_delay = float(os.getenv("NEWS_SPECULATIVE_DELAY", "0.5"))
+        self.speculation = {"runs": 0, "paid_off": 0, "skipped": 0}
+        self._speculation_lock = threading.Lock()
+        self._executor = None
+        
         print("✅ NewsAPI initialized")
     
     def fetch_news(
@@ -31,25 +59,299 @@ class NewsFetcher:
         query: str, 
         days: int = 7, 
         max_articles: int = 10
-    ) -> List[Dict]:
-        """Fetch real news articles from NewsAPI"""
+    ) -> List[Article]:
+        """Fetch real news articles, served from the local cache when fresh"""
+        
+        cache_key, cached = self._cache_lookup(query, days, max_articles)
+        if cached is not None:
+            print(f"⚡ Cache hit for '{query}' ({len(cached)} articles)")
+            return cached
+        
+        articles = self._fetch_from_api(query, days, max_articles)
+        self._cache_store(cache_key, articles)
+        
+        return articles
+    
+    def _cache_lookup(self, query: str, days: int, max_articles: int) -> Tuple[Optional[str], Optional[List[Article]]]:
+        if not self.cache:
+            return None, None
+        cache_key = self.cache.make_key(query, days, max_articles)
+        cached = self.cache.get(cache_key)
+        if cached is None:
+            return cache_key, None
+        return cache_key, [Article.from_dict(a) for a in cached]
+    
+    def _cache_store(self, cache_key: Optional[str], articles: List[Article]):
+        if self.cache and cache_key and articles:
+            self.cache.set(cache_key, [a.to_dict() for a in articles])
+    
+    def iter_articles(self, query: str, days: int = 7, limit: int = 100) -> Iterator[Article]:
+        """Lazily walk NewsAPI result pages, yielding normalized articles"""
+        page_size = min(limit, 100)
+        params = self._strict_params(query, days, page_size)
+        yielded = 0
+        page = 1
+        
+        print(f"🔍 Streaming news for: {query}")
+        while yielded < limit:
+            try:
+                response = self.http.get(self.base_url, params={**params, "page": page}, timeout=15)
+            except requests.exceptions.RequestException as e:
+                raise ValueError(f"❌ Network error: {str(e)}")
+            
+            if response.status_code == 401:
+                raise ValueError("❌ Invalid NewsAPI key!")
+            elif response.status_code == 429:
+                raise ValueError("❌ NewsAPI rate limit exceeded.")
+            
+            try:
+                data = response.json()
+            except ValueError:
+                data = None
+            # 5xx left after the session's retries, or an HTML error page; NewsAPI's own
+            # JSON 4xx bodies (e.g. the paging limit) are handled below
+            if response.status_code >= 500 or not isinstance(data, dict):
+                try:
+                    response.raise_for_status()
+                except requests.exceptions.HTTPError as e:
+                    raise ValueError(f"❌ Network error: {str(e)}")
+                raise ValueError("❌ NewsAPI error: unexpected response")
+            if data.get("status") != "ok":
+                # Free plans stop paging at 100 results; return what we have
+                if data.get("code") == "maximumResultsReached":
+                    print(f"⚠️ NewsAPI page limit reached after {yielded} articles")
+                    return
+                raise ValueError(f"❌ NewsAPI error: {data.get('message', 'Unknown')}")
+            
+            raw_count = len(data.get("articles", []))
+            for article in self._parse_articles(data, require_url=True):
+                yield article
+                yielded += 1
+                if yielded >= limit:
+                    return
+            
+            if raw_count < page_size or page * page_size >= data.get("totalResults", 0):
+                return
+            page += 1
+    
+    async def fetch_many(
+        self,
+        queries: List[str],
+        days: int = 7,
+        max_articles: int = 10,
+        concurrency: int = 5,
+        return_exceptions: bool = False
+    ) -> AsyncIterator[Tuple[str, Union[List[Article], Exception]]]:
+        """
+        Fetch several queries concurrently, yielding (query, articles) as each completes
+        A failed query (bad key, outage, NewsAPI error) raises and stops the rest; with
+        return_exceptions=True it is yielded as (query, error) instead. No news is just []
+        """
+        import httpx
+        
+        limiter = TokenBucket()
+        semaphore = asyncio.Semaphore(concurrency)
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        
+        async with httpx.AsyncClient(
+            headers={"X-Api-Key": self.api_key}, timeout=15, limits=limits
+        ) as client:
+            
+            async def run(query: str) -> Tuple[str, Union[List[Article], Exception]]:
+                async with semaphore:
+                    try:
+                        return query, await self._fetch_news_async(client, limiter, query, days, max_articles)
+                    except ValueError as e:
+                        # _get_async reports auth, rate-limit and transport failures this way
+                        if not return_exceptions:
+                            raise
+                        print(f"⚠️ Fetch failed for '{query}': {e}")
+                        return query, e
+            
+            tasks = [asyncio.create_task(run(q)) for q in queries]
+            try:
+                for finished in asyncio.as_completed(tasks):
+                    yield await finished
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def fetch_watchlist(self, queries: List[str], days: int = 7, max_articles: int = 10, concurrency: int = 5) -> Dict[str, List[Article]]:
+        """Blocking wrapper around fetch_many for scripts (raises on the first failed query)"""
+        
+        async def collect() -> Dict[str, List[Article]]:
+            return {q: arts async for q, arts in self.fetch_many(queries, days, max_articles, concurrency)}
+        
+        return asyncio.run(collect())
+    
+    async def _fetch_news_async(self, client, limiter: TokenBucket, query: str, days: int, max_articles: int) -> List[Article]:
+        """Async counterpart of fetch_news sharing the same cache"""
+        # SQLite cache calls block; keep them off the event loop
+        cache_key, cached = await asyncio.to_thread(self._cache_lookup, query, days, max_articles)
+        if cached is not None:
+            return cached
+        
+        broad_task = None
+        go = asyncio.Event()
+        state = {"sent": False}
+        if self.speculative:
+            broad_task = asyncio.create_task(
+                self._speculative_get_async(go, state, client, limiter, self._broad_params(query, days, max_articles))
+            )
+            self._count_speculation("runs")
+        
+        try:
+            data = await self._get_async(client, limiter, self._strict_params(query, days, max_articles))
+            articles = self._parse_articles(data, require_url=True)
+            
+            if not articles:
+                try:
+                    if broad_task is not None:
+                        go.set()
+                        data = await broad_task
+                        self._count_speculation("paid_off")
+                    else:
+                        data = await self._get_async(client, limiter, self._broad_params(query, days, max_articles))
+                    articles = self._parse_articles(data, require_url=False)
+                except Exception as e:
+                    print(f"⚠️ Broader search failed: {e}")
+        finally:
+            if broad_task is not None:
+                if not state["sent"]:
+                    self._count_speculation("skipped")
+                broad_task.cancel()
+                # Retrieve the loser's result/exception so it is never logged as unhandled
+                await asyncio.gather(broad_task, return_exceptions=True)
+        
+        await asyncio.to_thread(self._cache_store, cache_key, articles)
+        
+        print(f"✅ Found {len(articles)} articles for '{query}'")
+        return articles
+    
+    async def _speculative_get_async(self, go: asyncio.Event, state: Dict, client, limiter: TokenBucket, params: Dict) -> Dict:
+        """Broad search sent after the delay, or at once when `go` is set; cancelling first skips it"""
+        try:
+            await asyncio.wait_for(go.wait(), self.speculative_delay)
+        except asyncio.TimeoutError:
+            pass
+        state["sent"] = True
+        return await self._get_async(client, limiter, params)
+    
+    async def _get_async(self, client, limiter: TokenBucket, params: Dict) -> Dict:
+        """Rate-limited async GET with the same retry policy as the sync session"""
+        import httpx
         
+        attempt = 0
+        while True:
+            await limiter.acquire()
+            try:
+                response = await client.get(self.base_url, params=params)
+            except httpx.TransportError as e:
+                # Connection errors and timeouts retry like the sync session does
+                if attempt < self.http.max_retries:
+                    await asyncio.sleep(self._backoff(attempt, None))
+                    attempt += 1
+                    continue
+                if isinstance(e, httpx.TimeoutException):
+                    raise ValueError("❌ Request timeout. Please try again.")
+                raise ValueError(f"❌ Network error: {str(e)}")
+            
+            if response.status_code in RETRY_STATUSES and attempt < self.http.max_retries:
+                await asyncio.sleep(self._backoff(attempt, response.headers.get("Retry-After")))
+                attempt += 1
+                continue
+            
+            if response.status_code == 401:
+                raise ValueError("❌ Invalid NewsAPI key!")
+            elif response.status_code == 429:
+                raise ValueError("❌ NewsAPI rate limit exceeded.")
+            
+            try:
+                response.raise_for_status()
+                data = response.json()
+            except (httpx.HTTPStatusError, ValueError) as e:
+                raise ValueError(f"❌ Network error: {str(e)}")
+            
+            if data.get("status") != "ok":
+                raise ValueError(f"❌ NewsAPI error: {data.get('message', 'Unknown')}")
+            
+            return data
+    
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        """Seconds to wait before an async retry (Retry-After or full jitter)"""
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = random.uniform(0, min(self.http.backoff_cap, self.http.backoff_base * (2 ** attempt)))
+        return min(delay, self.http.backoff_cap)
+    
+    def cache_stats(self) -> Dict:
+        """Cache hit/miss counters"""
+        if not self.cache:
+            return {"hits": 0, "misses": 0, "hit_rate": 0.0, "entries": 0}
+        return self.cache.stats()
+    
+    def http_stats(self) -> Dict:
+        """NewsAPI request latency and retry counters"""
+        return self.http.stats()
+    
+    def speculation_stats(self) -> Dict:
+        """How often the speculative broad search was actually used (skipped = never sent)"""
+        with self._speculation_lock:
+            stats = dict(self.speculation)
+        runs = stats["runs"]
+        stats["paid_off_rate"] = stats["paid_off"] / runs if runs else 0.0
+        return stats
+    
+    def _count_speculation(self, key: str):
+        with self._speculation_lock:
+            self.speculation[key] += 1
+    
+    def _strict_params(self, query: str, days: int, max_articles: int) -> Dict:
+        """Query parameters for the finance-focused search"""
         from_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
         to_date = datetime.now().strftime("%Y-%m-%d")
         
-        params = {
+        return {
             "q": f'"{query}" AND (stock OR shares OR market OR earnings OR investor)',
             "from": from_date,
             "to": to_date,
             "sortBy": "publishedAt",
             "language": "en",
-            "pageSize": min(max_articles, 100),
-            "apiKey": self.api_key
+            "pageSize": min(max_articles, 100)
+        }
+    
+    def _broad_params(self, query: str, days: int, max_articles: int) -> Dict:
+        """Query parameters for the plain-keyword fallback search"""
+        from_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        
+        return {
+            "q": query,
+            "from": from_date,
+            "sortBy": "relevancy",
+            "language": "en",
+            "pageSize": min(max_articles, 100)
         }
+    
+    def _fetch_from_api(self, query: str, days: int, max_articles: int) -> List[Article]:
+        """Fetch real news articles from NewsAPI"""
+        
+        params = self._strict_params(query, days, max_articles)
+        
+        broad_future = None
+        # Set with cancel=False to send the broad request now, cancel=True to drop it
+        decided = threading.Event()
+        state = {"cancel": False}
+        if self.speculative:
+            with self._speculation_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="news-broad")
+            broad_future = self._executor.submit(self._speculative_broad, decided, state, query, days, max_articles)
+            self._count_speculation("runs")
         
         try:
             print(f"🔍 Fetching news for: {query}")
-            response = requests.get(self.base_url, params=params, timeout=15)
+            response = self.http.get(self.base_url, params=params, timeout=15)
             
             if response.status_code == 401:
                 raise ValueError("❌ Invalid NewsAPI key!")
@@ -62,27 +364,15 @@ class NewsFetcher:
             if data.get("status") != "ok":
                 raise ValueError(f"❌ NewsAPI error: {data.get('message', 'Unknown')}")
             
-            articles = []
-            for article in data.get("articles", []):
-                if not article.get("title") or article.get("title") == "[Removed]":
-                    continue
-                if not article.get("url"):
-                    continue
-                
-                articles.append({
-                    "title": article.get("title", "").strip(),
-                    "description": (article.get("description", "") or "").strip(),
-                    "content": self._clean_content(article.get("content", "")),
-                    "url": article.get("url", ""),
-                    "source": article.get("source", {}).get("name", "Unknown"),
-                    "published_at": self._format_date(article.get("publishedAt", "")),
-                    "author": article.get("author") or "Staff Reporter",
-                    "image_url": article.get("urlToImage", "")
-                })
+            articles = self._parse_articles(data, require_url=True)
             
             print(f"✅ Found {len(articles)} articles for '{query}'")
             
             if not articles:
+                if broad_future is not None:
+                    self._count_speculation("paid_off")
+                    decided.set()
+                    return broad_future.result()
                 return self._fetch_broader_search(query, days, max_articles)
             
             return articles
@@ -91,60 +381,58 @@ class NewsFetcher:
             raise ValueError("❌ Request timeout. Please try again.")
         except requests.exceptions.RequestException as e:
             raise ValueError(f"❌ Network error: {str(e)}")
+        finally:
+            # Stops the broad request if it has not been sent yet
+            if broad_future is not None and not decided.is_set():
+                state["cancel"] = True
+                decided.set()
+    
+    def _speculative_broad(self, decided: threading.Event, state: Dict, query: str, days: int, max_articles: int) -> List[Article]:
+        """Broad search sent after the delay unless cancelled first"""
+        decided.wait(self.speculative_delay)
+        if state["cancel"]:
+            self._count_speculation("skipped")
+            return []
+        return self._fetch_broader_search(query, days, max_articles)
     
-    def _fetch_broader_search(self, query: str, days: int, max_articles: int) -> List[Dict]:
+    def _fetch_broader_search(self, query: str, days: int, max_articles: int) -> List[Article]:
         """Broader search if specific search returns no results"""
-        from_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
-        
-        params = {
-            "q": query,
-            "from": from_date,
-            "sortBy": "relevancy",
-            "language": "en",
-            "pageSize": max_articles,
-            "apiKey": self.api_key
-        }
+        params = self._broad_params(query, days, max_articles)
         
         try:
-            response = requests.get(self.base_url, params=params, timeout=15)
+            response = self.http.get(self.base_url, params=params, timeout=15)
             response.raise_for_status()
-            data = response.json()
-            
-            articles = []
-            for article in data.get("articles", []):
-                if not article.get("title") or article.get("title") == "[Removed]":
-                    continue
-                
-                articles.append({
-                    "title": article.get("title", "").strip(),
-                    "description": (article.get("description", "") or "").strip(),
-                    "content": self._clean_content(article.get("content", "")),
-                    "url": article.get("url", ""),
-                    "source": article.get("source", {}).get("name", "Unknown"),
-                    "published_at": self._format_date(article.get("publishedAt", "")),
-                    "author": article.get("author") or "Staff Reporter",
-                    "image_url": article.get("urlToImage", "")
-                })
-            
-            return articles
+            return self._parse_articles(response.json(), require_url=False)
             
         except Exception as e:
             print(f"⚠️ Broader search failed: {e}")
             return []
     
+    def _parse_articles(self, data: Dict, require_url: bool = True) -> List[Article]:
+        """Normalize raw NewsAPI articles"""
+        articles = []
+        for article in data.get("articles", []):
+            if not article.get("title") or article.get("title") == "[Removed]":
+                continue
+            if require_url and not article.get("url"):
+                continue
+            
+            articles.append(Article(
+                title=article.get("title", "").strip(),
+                description=(article.get("description", "") or "").strip(),
+                content=self._clean_content(article.get("content", "")),
+                url=article.get("url", "") or "",
+                source=(article.get("source") or {}).get("name") or "Unknown",
+                published_at=parse_date(article.get("publishedAt")),
+                author=article.get("author") or "Staff Reporter",
+                image_url=article.get("urlToImage", "") or ""
+            ))
+        
+        return articles
+    
     def _clean_content(self, content: str) -> str:
         """Remove truncation markers"""
         if not content:
             return ""
-        content = re.sub(r'\[\+\d+ chars\]', '', content)
+        content = TRUNCATION_MARKER.sub('', content)
         return content.strip()
-    
-    def _format_date(self, date_str: str) -> str:
-        """Format date for display"""
-        if not date_str:
-            return "Unknown date"
-        try:
-            dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-            return dt.strftime("%B %d, %Y at %I:%M %p")
-        except:
-            return date_str
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""
+Research Pipeline
+fetch → process → dedup → index → insight for one company, outside Streamlit
+(shared by the CLI and the HTTP service)
+"""
+
+import os
+import re
+import time
+from typing import Dict, List, Optional, NamedTuple
+
+from .article import Article, fingerprint
+from .vector_store import VectorStore
+
+
+class Prepared(NamedTuple):
+    articles: List[Article]
+    store: Optional[VectorStore]
+    timings: Dict[str, float]
+
+
+class ResearchPipeline:
+    """Owns one set of components and runs the full analysis per company"""
+
+    def __init__(self, news=None, processor=None, dedup=None, summarizer=None, structured: Optional[bool] = None):
+        # Components are injectable so tests/services can pass stubs
+        if news is None:
+            from .news_fetcher import NewsFetcher
+            news = NewsFetcher()
+        if processor is None:
+            from .text_processor import TextProcessor
+            processor = TextProcessor()
+        if dedup is None and os.getenv("PIPELINE_DEDUP", "1") == "1":
+            from .deduplicator import ArticleDeduplicator
+            dedup = ArticleDeduplicator()
+        if summarizer is None:
+            from .summarizer import Summarizer
+            summarizer = Summarizer()
+
+        self.news = news
+        self.processor = processor
+        self.dedup = dedup
+        self.summarizer = summarizer
+        self.structured = summarizer.structured_output if structured is None else structured
+
+        # One embedding model for every company's index
+        self.embedder = None
+        if os.getenv("EMBEDDING_BACKEND", "tfidf").lower() == "dense":
+            from .llm_router import EmbeddingRouter
+            self.embedder = EmbeddingRouter()
+
+    def prepare(
+        self,
+        company: str,
+        days: int = 7,
+        max_articles: int = 10,
+        snapshot_dir: Optional[str] = None,
+        articles: Optional[List[Article]] = None,
+        index: bool = True
+    ) -> Prepared:
+        """
+        Fetch, process, dedup and index one company's news
+        Pass `articles` when they were already fetched (e.g. NewsFetcher.fetch_many). The
+        index is only built when it will be queried (`index`) or saved (`snapshot_dir`)
+        Raises ValueError (as NewsFetcher does) on fetch errors
+        """
+        timings = {}
+        if articles is None:
+            start = time.perf_counter()
+            articles = self.news.fetch_news(company, days, max_articles)
+            timings["fetch_ms"] = (time.perf_counter() - start) * 1000
+        if not articles:
+            return Prepared([], None, timings)
+
+        step = time.perf_counter()
+        processed = self.processor.process_articles(articles)
+        if self.dedup is not None:
+            processed = self.dedup.filter(processed)
+        timings["process_ms"] = (time.perf_counter() - step) * 1000
+        if not index and not snapshot_dir:
+            return Prepared(processed, None, timings)
+
+        step = time.perf_counter()
+        store = VectorStore(embedder=self.embedder)
+        store.add_documents(processed)
+        if snapshot_dir:
+            store.save(os.path.join(snapshot_dir, slugify(company)))
+        timings["index_ms"] = (time.perf_counter() - step) * 1000
+        return Prepared(processed, store, timings)
+
+    def analyze(
+        self,
+        company: str,
+        days: int = 7,
+        max_articles: int = 10,
+        snapshot_dir: Optional[str] = None,
+        prepared: Optional[Prepared] = None,
+        articles: Optional[List[Article]] = None
+    ) -> Dict:
+        """Full analysis record for one company (pass `prepared` to reuse an index, `articles` to skip the fetch)"""
+        if prepared is None:
+            # The insight never queries the index; build it only to snapshot it
+            prepared = self.prepare(company, days, max_articles, snapshot_dir, articles, index=False)
+        processed = prepared.articles
+        timings = dict(prepared.timings)
+
+        record = {"company": company, "days": days, "articles": 0, "status": "no_articles"}
+        if not processed:
+            record["timings"] = timings
+            return record
+
+        step = time.perf_counter()
+        signals = self.summarizer.preliminary_signals(processed, company)
+        signals.pop("per_article", None)
+        if self.structured:
+            structured = self.summarizer.generate_structured_insight(processed, company)
+            insight = self.summarizer.render_insight(structured, company)
+            provider = structured.get("provider", "")
+        else:
+            structured = None
+            insight = self.summarizer.generate_investment_insight(processed, company)
+            provider = self.summarizer.router.last_provider()
+        timings["insight_ms"] = (time.perf_counter() - step) * 1000
+        timings["total_ms"] = sum(timings.values())
+
+        record.update({
+            "status": "ok",
+            "articles": len(processed),
+            "fingerprint": fingerprint(processed),
+            "sentiment": structured["sentiment"] if structured else signals["sentiment"],
+            "recommendation": structured["recommendation"] if structured else None,
+            "lexicon_score": signals["score"],
+            "analyst_actions": len(signals["analyst_actions"]),
+            "provider": provider,
+            "insight": insight,
+            "structured": structured,
+            "sources": sorted({a.source for a in processed}),
+            "timings": timings
+        })
+        return record
+
+    def stats(self) -> Dict:
+        """Cache and LLM counters across every component"""
+        router = self.summarizer.router
+        usage = router.usage_stats()
+        return {
+            "llm_calls": sum(u["calls"] for u in usage.values()),
+            "tokens_in": sum(u["tokens_in"] for u in usage.values()),
+            "tokens_out": sum(u["tokens_out"] for u in usage.values()),
+            "llm_cache": router.cache_stats(),
+            "news_cache": self.news.cache_stats() if hasattr(self.news, "cache_stats") else {}
+        }
+
+
+def slugify(company: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", company.lower()).strip("-") or "company"
@@ -0,0 +1,91 @@
+"""
+Token-Budgeted Prompt Assembly
+Ranks articles by information value and packs their lead sentences into an
+input-token budget, so prompt size (cost, latency) is set deliberately.
+"""
+
+from datetime import datetime, timezone
+from typing import List, Dict, Union, Optional, NamedTuple
+
+from .article import Article
+from .signals import FACT_PATTERN
+from .tokens import count_tokens, split_sentences, trim_to_sentences
+
+
+class PackedText(NamedTuple):
+    text: str
+    tokens: int
+    articles: List[Article]
+
+
+def article_value(article: Article, company: Optional[str] = None, now: Optional[datetime] = None) -> float:
+    """Heuristic usefulness: mentions the company, carries figures, is recent"""
+    text = article.text
+    score = min(len(FACT_PATTERN.findall(text)), 5) * 0.5
+    if company and company.lower() in (article.title or "").lower():
+        score += 2.0
+    if article.published_at is not None:
+        now = now or datetime.now(timezone.utc)
+        published = article.published_at
+        if published.tzinfo is None:
+            published = published.replace(tzinfo=timezone.utc)
+        age_days = max(0.0, (now - published).total_seconds() / 86400)
+        score += 2.0 * 0.5 ** (age_days / 3)
+    if len(text) < 80:
+        score -= 1.0
+    return score
+
+
+def rank_articles(articles: List[Union[Article, Dict]], company: Optional[str] = None) -> List[Article]:
+    """Articles ordered by article_value (stable for ties)"""
+    articles = [Article.coerce(a) for a in articles]
+    now = datetime.now(timezone.utc)
+    values = [article_value(a, company, now) for a in articles]
+    order = sorted(range(len(articles)), key=lambda i: -values[i])
+    return [articles[i] for i in order]
+
+
+def pack_articles(
+    articles: List[Union[Article, Dict]],
+    budget: int,
+    company: Optional[str] = None,
+    max_articles: int = 12
+) -> PackedText:
+    """
+    Fill `budget` tokens round-robin: every ranked article gets its lead sentence
+    before any article gets a second one; lower-ranked articles drop out first
+    """
+    ranked = rank_articles(articles, company)[:max_articles]
+    sentences = [split_sentences(a.text) for a in ranked]
+    headers = [f"{a.title or 'Untitled'} ({a.source})" for a in ranked]
+    bodies: Dict[int, List[str]] = {}
+    cursor = [0] * len(ranked)
+    open_rows = set(range(len(ranked)))
+    used = 0
+
+    while open_rows:
+        progressed = False
+        for i in range(len(ranked)):
+            if i not in open_rows:
+                continue
+            if cursor[i] >= len(sentences[i]):
+                open_rows.discard(i)
+                continue
+            sentence = sentences[i][cursor[i]]
+            # Over-long lead sentences are cut rather than losing the article entirely
+            if i not in bodies:
+                sentence = trim_to_sentences(sentence, max(20, budget // max(len(ranked), 1)))
+            cost = count_tokens(sentence) + (count_tokens(headers[i]) + 3 if i not in bodies else 0)
+            if used + cost > budget:
+                open_rows.discard(i)
+                continue
+            bodies.setdefault(i, []).append(sentence)
+            cursor[i] += 1
+            used += cost
+            progressed = True
+        if not progressed:
+            break
+
+    kept = sorted(bodies)
+    text = "\n\n".join(f"{n}. {headers[i]}\n{' '.join(bodies[i])}" for n, i in enumerate(kept, 1))
+    return PackedText(text, count_tokens(text), [ranked[i] for i in kept])
@@ -0,0 +1,35 @@
+"""
+Token Bucket Rate Limiter
+Keeps concurrent NewsAPI traffic inside the plan's request quota
+"""
+
+import os
+import time
+import asyncio
+from typing import Optional
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: Optional[float] = None, capacity: Optional[int] = None):
+        self.rate = rate if rate is not None else float(os.getenv("NEWS_API_RATE", "1.0"))
+        self.capacity = capacity if capacity is not None else int(os.getenv("NEWS_API_BURST", "5"))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Wait until a token is available, then take it"""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
@@ -0,0 +1,185 @@
+"""
+LLM Response Cache
+SQLite-backed exact-match cache for completions, plus an optional semantic
+layer that reuses answers to near-identical questions over the same articles
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Optional, Tuple, FrozenSet
+
+from .bm25 import tokenize
+
+
+def question_terms(text: str) -> FrozenSet[str]:
+    """Content words of a question, with a light plural fold"""
+    return frozenset(t[:-1] if len(t) > 3 and t.endswith("s") else t for t in tokenize(text))
+
+
+class ResponseCache:
+    """Persistent completion cache with TTL, LRU eviction and hit-rate metrics"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_seconds: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        semantic_threshold: Optional[float] = None
+    ):
+        self.path = path or os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite")
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else int(os.getenv("LLM_CACHE_TTL", "3600"))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+        # Jaccard overlap of question terms; 0 disables the semantic layer
+        self.semantic_threshold = (
+            semantic_threshold if semantic_threshold is not None
+            else float(os.getenv("LLM_CACHE_SEMANTIC_THRESHOLD", "0.75"))
+        )
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if self.path != ":memory:":
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                family TEXT NOT NULL,
+                scope TEXT,
+                terms TEXT,
+                provider TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_scope ON llm_cache (family, scope)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def family_key(provider: str, model: str, system_prompt: str, max_tokens: int, temperature: float) -> str:
+        """Everything but the prompt that determines a completion"""
+        raw = json.dumps([provider, model, system_prompt, int(max_tokens), round(float(temperature), 3)])
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def make_key(family: str, prompt: str) -> str:
+        prompt_hash = hashlib.sha1(prompt.encode("utf-8")).hexdigest()
+        return hashlib.sha1(f"{family}\0{prompt_hash}".encode("utf-8")).hexdigest()
+
+    def get(
+        self,
+        family: str,
+        prompt: str,
+        scope: Optional[str] = None,
+        query: Optional[str] = None
+    ) -> Optional[Tuple[str, str]]:
+        """Return (provider, response) or None; tries the exact key, then similar questions in `scope`"""
+        now = time.time()
+        key = self.make_key(family, prompt)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT provider, response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[2] <= self.ttl_seconds:
+                self._touch(key, now)
+                self.exact_hits += 1
+                return row[0], row[1]
+
+            if scope and query and self.semantic_threshold > 0:
+                hit = self._semantic_lookup(family, scope, question_terms(query), now)
+                if hit is not None:
+                    self.semantic_hits += 1
+                    return hit
+        return None
+
+    def _semantic_lookup(self, family: str, scope: str, terms: FrozenSet[str], now: float) -> Optional[Tuple[str, str]]:
+        if not terms:
+            return None
+        rows = self._conn.execute(
+            "SELECT key, terms, provider, response FROM llm_cache "
+            "WHERE family = ? AND scope = ? AND created_at >= ?",
+            (family, scope, now - self.ttl_seconds)
+        ).fetchall()
+
+        best, best_score = None, self.semantic_threshold
+        for key, stored, provider, response in rows:
+            other = frozenset(stored.split()) if stored else frozenset()
+            if not other:
+                continue
+            score = len(terms & other) / len(terms | other)
+            if score >= best_score:
+                best, best_score = (key, provider, response), score
+        if best is None:
+            return None
+        self._touch(best[0], now)
+        return best[1], best[2]
+
+    def _touch(self, key: str, now: float):
+        self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        self._conn.commit()
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def set(
+        self,
+        family: str,
+        prompt: str,
+        provider: str,
+        response: str,
+        scope: Optional[str] = None,
+        query: Optional[str] = None
+    ):
+        """Store a completion and evict least recently used entries over the limit"""
+        now = time.time()
+        terms = " ".join(sorted(question_terms(query))) if query else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache "
+                "(key, family, scope, terms, provider, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.make_key(family, prompt), family, scope, terms, provider, response, now, now)
+            )
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Drop every cached completion"""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        """Exact/semantic hit counters and current size"""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        hits = self.exact_hits + self.semantic_hits
+        total = hits + self.misses
+        return {
+            "hits": hits,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": hits / total if total else 0.0,
+            "entries": size
+        }
@@ -0,0 +1,342 @@
+"""
+Research HTTP Service
+Minimal ASGI app over ResearchPipeline for other internal services
+
+    uvicorn src.service:app --workers 4
+
+    POST /analyze    {"company": "Apple", "days": 7, "max_articles": 10}
+    POST /ask        {"company": "Apple", "question": "What are the risks?"}
+    POST /summarize  {"company": "Apple"} or {"articles": [...]}
+    GET  /health
+
+Concurrent calls for the same company share one in-flight fetch + index (and
+identical /analyze calls one analysis), and the blocking pipeline work runs on
+a bounded thread pool. Each uvicorn worker process gets its own pool; the
+SQLite caches are shared on disk.
+"""
+
+import os
+import json
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from .article import Article, fingerprint
+from .pipeline import Prepared
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class StaticNewsFetcher:
+    """Serves articles from a JSON/JSONL fixture instead of NewsAPI (local runs, tests)"""
+
+    def __init__(self, path: str):
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read().strip()
+        if text.startswith("["):
+            rows = json.loads(text)
+        else:
+            rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+        self.articles = [to_article(row) for row in rows]
+        print(f"✅ Static news fixture: {len(self.articles)} articles")
+
+    def fetch_news(self, query: str, days: int = 7, max_articles: int = 10) -> List[Article]:
+        terms = query.lower().split()
+        matches = [
+            a for a in self.articles
+            if all(t in f"{a.title} {a.description} {a.content}".lower() for t in terms)
+        ]
+        return matches[:max_articles]
+
+
+def to_article(data: Dict) -> Article:
+    """Article from a request payload (NewsAPI-style nested source is accepted)"""
+    if not isinstance(data, dict):
+        raise HTTPError(400, "❌ Each article must be a JSON object")
+    data = dict(data)
+    if isinstance(data.get("source"), dict):
+        data["source"] = data["source"].get("name")
+    if "publishedAt" in data and "published_at" not in data:
+        data["published_at"] = data["publishedAt"]
+    return Article.from_dict(data)
+
+
+class ResearchService:
+    """ASGI application; the pipeline is built on startup (or first request)"""
+
+    def __init__(
+        self,
+        pipeline=None,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        max_sessions: Optional[int] = None,
+        session_ttl: Optional[float] = None
+    ):
+        self.pipeline = pipeline
+        self.workers = workers or int(os.getenv("SERVICE_WORKERS", str(min(8, (os.cpu_count() or 1) * 2))))
+        # Requests beyond this many queued/running jobs are refused with 503
+        self.max_pending = max_pending or int(os.getenv("SERVICE_MAX_PENDING", "64"))
+        self.max_sessions = max_sessions or int(os.getenv("SERVICE_SESSIONS", "50"))
+        self.session_ttl = session_ttl if session_ttl is not None else float(os.getenv("SERVICE_SESSION_TTL", "900"))
+        self.max_body = int(os.getenv("SERVICE_MAX_BODY", str(1 << 20)))
+
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="research")
+        self._build_lock = threading.Lock()
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self._pending = 0
+        self._sessions: "OrderedDict[Tuple, Tuple[float, Prepared]]" = OrderedDict()
+        self.counters = {"requests": 0, "computed": 0, "coalesced": 0, "rejected": 0}
+
+        self.routes = {
+            ("POST", "/analyze"): self.analyze,
+            ("POST", "/ask"): self.ask,
+            ("POST", "/summarize"): self.summarize,
+            ("GET", "/health"): self.health
+        }
+
+    # ---------- components ----------
+
+    def _get_pipeline(self):
+        with self._build_lock:
+            if self.pipeline is None:
+                from .pipeline import ResearchPipeline
+                fixture = os.getenv("SERVICE_NEWS_FIXTURE")
+                news = StaticNewsFetcher(fixture) if fixture else None
+                self.pipeline = ResearchPipeline(news=news)
+            return self.pipeline
+
+    async def _pipeline_ready(self):
+        """The pipeline, built on the pool if lifespan startup did not already (model loads block)"""
+        if self.pipeline is None:
+            await asyncio.get_running_loop().run_in_executor(self.executor, self._get_pipeline)
+        return self.pipeline
+
+    async def _run(self, func, *args):
+        """Run blocking work on the bounded pool, refusing when the queue is full"""
+        if self._pending >= self.max_pending:
+            self.counters["rejected"] += 1
+            raise HTTPError(503, "⚠️ Service busy, retry shortly")
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self._pending -= 1
+
+    async def _coalesce(self, key: Tuple, func, *args):
+        """Callers with the same key await one shared computation"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run(func, *args))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._inflight.pop(key, None) if self._inflight.get(key) is t else None)
+            self.counters["computed"] += 1
+        else:
+            self.counters["coalesced"] += 1
+        # A disconnecting client must not cancel the work others are waiting on
+        return await asyncio.shield(task)
+
+    # ---------- sessions (indexed articles per company, for /ask and /summarize) ----------
+
+    @staticmethod
+    def _session_key(company: str, days: int, max_articles: int) -> Tuple:
+        return (" ".join(company.lower().split()), days, max_articles)
+
+    def _session_get(self, key: Tuple) -> Optional[Prepared]:
+        entry = self._sessions.get(key)
+        if entry is None:
+            return None
+        created, prepared = entry
+        if time.time() - created > self.session_ttl:
+            del self._sessions[key]
+            return None
+        self._sessions.move_to_end(key)
+        return prepared
+
+    def _session_set(self, key: Tuple, prepared: Prepared):
+        self._sessions[key] = (time.time(), prepared)
+        self._sessions.move_to_end(key)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    async def _load(self, company: str, days: int, max_articles: int) -> Prepared:
+        """Session entry, or one fetch + index shared by every endpoint asking for this key"""
+        key = self._session_key(company, days, max_articles)
+        prepared = self._session_get(key)
+        if prepared is None:
+            pipeline = await self._pipeline_ready()
+            prepared = await self._coalesce(("prepare",) + key, pipeline.prepare, company, days, max_articles)
+            self._session_set(key, prepared)
+        return prepared
+
+    async def _prepared(self, company: str, days: int, max_articles: int) -> Prepared:
+        prepared = await self._load(company, days, max_articles)
+        if not prepared.articles:
+            raise HTTPError(404, f"⚠️ No articles found for '{company}'")
+        return prepared
+
+    # ---------- endpoints ----------
+
+    async def analyze(self, body: Dict) -> Dict:
+        company, days, max_articles = self._company_args(body)
+        key = self._session_key(company, days, max_articles)
+        # Same prepare key as /ask and /summarize, so concurrent calls fetch and index once
+        prepared = await self._load(company, days, max_articles)
+        pipeline = await self._pipeline_ready()
+        return await self._coalesce(
+            ("analyze",) + key, pipeline.analyze, company, days, max_articles, None, prepared
+        )
+
+    async def ask(self, body: Dict) -> Dict:
+        company, days, max_articles = self._company_args(body)
+        question = str(body.get("question", "")).strip()
+        if not question:
+            raise HTTPError(400, "❌ 'question' is required")
+        prepared = await self._prepared(company, days, max_articles)
+        summarizer = (await self._pipeline_ready()).summarizer
+
+        # Retrieval blocks (embeddings); the LLM call is async so slow providers can be hedged
+        context = await self._run(prepared.store.get_context, question)
+        answer = await summarizer.aanswer_question(question, context, company, fingerprint=fingerprint(prepared.articles))
+        # No await since the answer arrived, so this is still the provider that served it
+        provider = summarizer.router.last_provider()
+        return {"company": company, "question": question, "answer": answer, "provider": provider}
+
+    async def summarize(self, body: Dict) -> Dict:
+        if "articles" in body:
+            if not isinstance(body["articles"], list) or not body["articles"]:
+                raise HTTPError(400, "❌ 'articles' must be a non-empty list")
+            articles = [to_article(a) for a in body["articles"]]
+            pipeline = await self._pipeline_ready()
+            articles = await self._run(pipeline.processor.process_articles, articles)
+        else:
+            company, days, max_articles = self._company_args(body)
+            articles = (await self._prepared(company, days, max_articles)).articles
+            pipeline = await self._pipeline_ready()
+
+        summaries = await self._run(pipeline.summarizer.summarize_articles, articles)
+        return {
+            "summaries": [
+                {"title": a.title, "url": a.url, "source": a.source, "summary": s}
+                for a, s in zip(articles, summaries)
+            ]
+        }
+
+    async def health(self, body: Dict) -> Dict:
+        pipeline = await self._pipeline_ready()
+        return {
+            "status": "ok",
+            "providers": pipeline.summarizer.router.provider_status(),
+            "pipeline": pipeline.stats(),
+            "service": {
+                **self.counters,
+                "workers": self.workers,
+                "pending": self._pending,
+                "inflight": len(self._inflight),
+                "sessions": len(self._sessions)
+            }
+        }
+
+    @staticmethod
+    def _company_args(body: Dict) -> Tuple[str, int, int]:
+        company = str(body.get("company", "")).strip()
+        if not company:
+            raise HTTPError(400, "❌ 'company' is required")
+        try:
+            days = int(body.get("days", 7))
+            max_articles = int(body.get("max_articles", 10))
+        except (TypeError, ValueError):
+            raise HTTPError(400, "❌ 'days' and 'max_articles' must be integers")
+        if not 1 <= days <= 30 or not 1 <= max_articles <= 100:
+            raise HTTPError(400, "❌ 'days' must be 1-30 and 'max_articles' 1-100")
+        return company, days, max_articles
+
+    # ---------- ASGI ----------
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        self.counters["requests"] += 1
+        try:
+            handler = self.routes.get((scope["method"], scope["path"].rstrip("/") or "/"))
+            if handler is None:
+                if any(path == scope["path"] for _, path in self.routes):
+                    raise HTTPError(405, "❌ Method not allowed")
+                raise HTTPError(404, "❌ Not found")
+            body = await self._read_json(receive) if scope["method"] == "POST" else {}
+            status, payload = 200, await handler(body)
+        except HTTPError as e:
+            status, payload = e.status, {"error": e.message}
+        except ValueError as e:
+            # NewsFetcher and the LLM router report upstream failures (bad key, outage,
+            # NewsAPI errors) this way; request validation raises HTTPError(400) instead
+            status, payload = 502, {"error": str(e)}
+        except Exception as e:
+            print(f"❌ Service error: {e}")
+            status, payload = 500, {"error": "❌ Internal error"}
+
+        data = json.dumps(payload, default=str).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(data)).encode())]
+        })
+        await send({"type": "http.response.body", "body": data})
+
+    async def _read_json(self, receive) -> Dict:
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise HTTPError(400, "❌ Client disconnected")
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body:
+                raise HTTPError(413, "❌ Request body too large")
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        raw = b"".join(chunks)
+        if not raw:
+            return {}
+        try:
+            body = json.loads(raw)
+        except ValueError:
+            raise HTTPError(400, "❌ Request body must be JSON")
+        if not isinstance(body, dict):
+            raise HTTPError(400, "❌ Request body must be a JSON object")
+        return body
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    # Load models before the first request instead of during it
+                    await self._pipeline_ready()
+                    await send({"type": "lifespan.startup.complete"})
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def create_app(pipeline=None, **kwargs) -> ResearchService:
+    """Service over an existing (possibly stubbed) pipeline"""
+    return ResearchService(pipeline=pipeline, **kwargs)
+
+
+app = create_app()
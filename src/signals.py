@@ -0,0 +1,222 @@
+"""
+Offline Financial Signal Scoring
+Loughran-McDonald-style lexicon scores, numeric-fact extraction and analyst
+action detection; no LLM calls, microseconds per article.
+"""
+
+import re
+from typing import List, Dict, Union, Optional
+import numpy as np
+import scipy.sparse as sp
+
+from .article import Article
+from .tokens import split_sentences
+
+# Condensed from the Loughran-McDonald finance sentiment categories, plus
+# market-news phrasing the general lists miss
+POSITIVE_WORDS = """
+beat beats exceeded exceeds outperform outperformed outperforming outperforms strong stronger strongest
+gain gains gained growth grew grow growing record records surge surged surges soar soared rally rallied
+rebound rebounded improve improved improvement improvements improving profit profitable profitability
+upgrade upgraded upgrades raised raises boost boosted boosts optimistic optimism bullish upside
+momentum robust resilient accelerate accelerated accelerating expansion expand expanded innovative
+innovation breakthrough leading leadership success successful successfully achieve achieved
+achievement advantage advantages benefit benefited benefits favorable opportunity opportunities
+positive positively rewarding tailwind tailwinds efficient efficiency winning win wins strength
+strengths attractive exceptional excellent impressive solid healthy higher highs upbeat
+""".split()
+
+NEGATIVE_WORDS = """
+miss missed misses decline declined declines declining drop dropped drops fall fell falling plunge
+plunged plunges slump slumped tumble tumbled sink sank slide slid loss losses lose losing lost weak
+weaker weakest weakness weakening downgrade downgraded downgrades cut cuts cutting lowered lowers
+bearish downside risk risks risky concern concerns worried worries worry warning warns warned
+lawsuit lawsuits litigation investigation probe fine fined penalty penalties fraud recall recalls
+layoff layoffs bankruptcy default defaults delay delayed delays disappoint disappointed
+disappointing disappointment headwind headwinds pressure pressured volatility slowdown
+slowing slowed shortfall deficit adverse adversely negative negatively challenge challenges
+challenging difficult difficulty lower lows crisis inflation tariff tariffs sanctions
+downturn recession underperform underperformed selloff sell-off halted suspend suspended breach
+""".split()
+
+# Kept disjoint from NEGATIVE_WORDS so a word is counted in one category only
+UNCERTAINTY_WORDS = """
+may might could possibly perhaps uncertain uncertainty unclear unknown unpredictable speculative
+speculation rumor rumors reportedly approximately assume assumption depends depending pending
+tentative preliminary exposure fluctuate fluctuation volatile variability
+""".split()
+
+# Money amounts and percentages; shared with prompt_builder's article ranking
+FACT_PATTERN = re.compile(
+    r"(?:\$\s?\d[\d,]*(?:\.\d+)?\s*(?:billion|million|trillion|bn|m|b)?\b"
+    r"|\b\d[\d,]*(?:\.\d+)?\s*(?:%|percent\b|billion\b|million\b|trillion\b))",
+    re.IGNORECASE
+)
+
+ANALYST_PATTERN = re.compile(
+    r"\b(upgrade[sd]?|downgrade[sd]?|(?:raise[sd]?|lift(?:s|ed)?|boost(?:s|ed)?|"
+    r"cut(?:s)?|lower(?:s|ed)?|trim(?:s|med)?)\s+(?:its\s+|the\s+|their\s+)?price\s+target|"
+    r"initiate[sd]?\s+coverage|reiterate[sd]?|maintain(?:s|ed)?\s+(?:a|an|its)?\s*(?:buy|hold|sell|"
+    r"outperform|underperform|overweight|underweight|neutral))",
+    re.IGNORECASE
+)
+
+FIRM_PATTERN = re.compile(r"((?:[A-Z][\w&.'-]*\s){1,3})(?=(?:has\s|have\s)?(?:upgrade|downgrade|raise|lift|boost|cut|lower|trim|initiate|reiterate|maintain))")
+
+WORD_PATTERN = re.compile(r"[a-z][a-z'-]*")
+
+
+class SignalScorer:
+    """Vectorized lexicon scorer over processed article text"""
+
+    def __init__(self, bullish_threshold: float = 0.15):
+        self.bullish_threshold = bullish_threshold
+        vocab = sorted(set(POSITIVE_WORDS) | set(NEGATIVE_WORDS) | set(UNCERTAINTY_WORDS))
+        self.vocabulary = {word: i for i, word in enumerate(vocab)}
+        # Columns: positive, negative, uncertainty
+        self.weights = np.zeros((len(vocab), 3), dtype=np.float32)
+        for column, words in enumerate((POSITIVE_WORDS, NEGATIVE_WORDS, UNCERTAINTY_WORDS)):
+            for word in words:
+                self.weights[self.vocabulary[word], column] = 1.0
+
+    def _counts(self, texts: List[str]) -> np.ndarray:
+        """(n_texts, 3) lexicon hit counts plus word totals in a fourth column"""
+        rows, cols, totals = [], [], []
+        vocabulary = self.vocabulary
+        for row, text in enumerate(texts):
+            words = WORD_PATTERN.findall(text.lower())
+            totals.append(len(words))
+            for word in words:
+                col = vocabulary.get(word)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        # Sparse hit matrix (duplicates sum) times the category weights
+        hits = sp.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(texts), len(vocabulary))
+        )
+        return np.column_stack([hits @ self.weights, np.asarray(totals, dtype=np.float32)])
+
+    def score_texts(self, texts: List[str]) -> np.ndarray:
+        """Net tone per text in [-1, 1]: (positive - negative) / (positive + negative + 1)"""
+        if not texts:
+            return np.zeros(0, dtype=np.float32)
+        counts = self._counts(texts)
+        return (counts[:, 0] - counts[:, 1]) / (counts[:, 0] + counts[:, 1] + 1.0)
+
+    def score_articles(self, articles: List[Union[Article, Dict]]) -> List[Dict]:
+        """Per-article lexicon counts, net tone and label"""
+        articles = [Article.coerce(a) for a in articles]
+        texts = [" ".join(p for p in (a.title, a.text) if p) for a in articles]
+        if not texts:
+            return []
+        counts = self._counts(texts)
+        net = (counts[:, 0] - counts[:, 1]) / (counts[:, 0] + counts[:, 1] + 1.0)
+        return [
+            {
+                "title": a.title,
+                "positive": int(c[0]),
+                "negative": int(c[1]),
+                "uncertainty": int(c[2]),
+                "words": int(c[3]),
+                "score": float(score),
+                "label": self._label(score)
+            }
+            for a, c, score in zip(articles, counts, net)
+        ]
+
+    def _label(self, score: float) -> str:
+        if score >= self.bullish_threshold:
+            return "BULLISH"
+        if score <= -self.bullish_threshold:
+            return "BEARISH"
+        return "NEUTRAL"
+
+    @staticmethod
+    def extract_facts(text: str, limit: int = 5) -> List[str]:
+        """Sentences carrying figures (%, $, billion/million), shortest first"""
+        facts = [s for s in split_sentences(text) if FACT_PATTERN.search(s)]
+        facts.sort(key=len)
+        return [f if len(f) <= 200 else f[:197] + "..." for f in facts[:limit]]
+
+    @staticmethod
+    def detect_analyst_actions(text: str) -> List[Dict]:
+        """Upgrades, downgrades, price-target moves, initiations and reiterations"""
+        actions = []
+        for sentence in split_sentences(text):
+            match = ANALYST_PATTERN.search(sentence)
+            if not match:
+                continue
+            verb = match.group(1).lower()
+            if verb.startswith("upgrade"):
+                action = "upgrade"
+            elif verb.startswith("downgrade"):
+                action = "downgrade"
+            elif "price" in verb:
+                action = "target_cut" if re.match(r"(cut|lower|trim)", verb) else "target_raise"
+            elif verb.startswith("initiate"):
+                action = "initiation"
+            else:
+                action = "reiteration"
+            firm = FIRM_PATTERN.search(sentence[:match.end()])
+            actions.append({
+                "action": action,
+                "firm": firm.group(1).strip() if firm else None,
+                "text": sentence if len(sentence) <= 200 else sentence[:197] + "..."
+            })
+        return actions
+
+    def analyze(self, articles: List[Union[Article, Dict]], company: Optional[str] = None) -> Dict:
+        """Aggregate tone, facts and analyst actions across articles"""
+        articles = [Article.coerce(a) for a in articles]
+        per_article = self.score_articles(articles)
+        scores = np.array([p["score"] for p in per_article], dtype=np.float32)
+        mean = float(scores.mean()) if len(scores) else 0.0
+
+        facts: List[str] = []
+        actions: List[Dict] = []
+        for a in articles:
+            text = a.text
+            for fact in self.extract_facts(text, limit=2):
+                if fact not in facts:
+                    facts.append(fact)
+            actions.extend(self.detect_analyst_actions(text))
+
+        return {
+            "company": company,
+            "sentiment": self._label(mean),
+            "score": mean,
+            "bullish_articles": int((scores >= self.bullish_threshold).sum()),
+            "bearish_articles": int((scores <= -self.bullish_threshold).sum()),
+            "neutral_articles": int(len(scores) - (scores >= self.bullish_threshold).sum() - (scores <= -self.bullish_threshold).sum()),
+            "facts": facts[:6],
+            "analyst_actions": actions[:6],
+            "per_article": per_article
+        }
+
+    def render(self, analysis: Dict, company: str) -> str:
+        """Markdown in the same layout as the LLM insight"""
+        ranked = sorted(analysis["per_article"], key=lambda p: p["score"])
+        positives = [p["title"] for p in reversed(ranked) if p["score"] > 0][:2]
+        negatives = [p["title"] for p in ranked if p["score"] < 0][:2]
+        upgrades = sum(1 for a in analysis["analyst_actions"] if a["action"] in ("upgrade", "target_raise"))
+        downgrades = sum(1 for a in analysis["analyst_actions"] if a["action"] in ("downgrade", "target_cut"))
+
+        recommendation = {"BULLISH": "BUY", "BEARISH": "SELL"}.get(analysis["sentiment"], "HOLD")
+        lines = [
+            f"## {company.upper()} Analysis",
+            "",
+            f"### Sentiment: {analysis['sentiment']}",
+            f"Lexicon tone {analysis['score']:+.2f} across {len(ranked)} articles "
+            f"({analysis['bullish_articles']} bullish, {analysis['bearish_articles']} bearish)",
+            "",
+            "### Key Points"
+        ]
+        lines += [f"• {f}" for f in analysis["facts"][:3]] or ["• No figures reported"]
+        if upgrades or downgrades:
+            lines.append(f"• Analyst actions: {upgrades} positive, {downgrades} negative")
+        lines += ["", "### Catalysts"] + ([f"• {t}" for t in positives] or ["• None identified"])
+        lines += ["", "### Risks"] + ([f"• {t}" for t in negatives] or ["• None identified"])
+        lines += ["", "### Recommendation", f"{recommendation} (offline lexicon estimate, not an AI analysis)"]
+        return "\n".join(lines)
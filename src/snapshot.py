@@ -0,0 +1,187 @@
+"""
+Vector Store Snapshots
+Versioned on-disk format: raw .npy arrays (loadable with mmap_mode='r'),
+a JSON vocabulary and JSONL document metadata.
+"""
+
+import os
+import json
+import time
+from typing import List, Tuple, Optional
+import numpy as np
+
+from .article import Article, Passage
+
+FORMAT_VERSION = 2
+# v1 lacked squares.npy for incremental stores; it is recomputed on load
+READABLE_VERSIONS = (1, 2)
+
+
+def save_store(store, path: str):
+    """Write `store` to directory `path` (overwrites an existing snapshot)"""
+    os.makedirs(path, exist_ok=True)
+    # Invalidate any previous snapshot until this one is complete
+    manifest_path = os.path.join(path, "manifest.json")
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    documents = store.passages
+    backend = "tfidf"
+    if store.index is not None:
+        backend = "dense" if hasattr(store.index, "embedder") else "incremental"
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "backend": backend,
+        "created_at": time.time(),
+        "chunk_size": store.chunk_size,
+        "chunk_overlap": store.chunk_overlap
+    }
+
+    if backend == "tfidf":
+        if store.tfidf_matrix is None:
+            raise ValueError("❌ Nothing to save: index has not been built")
+        matrix = store.tfidf_matrix.tocsr()
+        _save_csr(path, matrix)
+        manifest["shape"] = list(matrix.shape)
+        vocabulary = {term: int(i) for term, i in store.vectorizer.vocabulary_.items()}
+        with open(os.path.join(path, "vocabulary.json"), "w", encoding="utf-8") as f:
+            json.dump(vocabulary, f)
+        np.save(os.path.join(path, "idf.npy"), store.vectorizer.idf_.astype(np.float64))
+
+    elif backend == "incremental":
+        import scipy.sparse as sp
+        index = store.index
+        # Merge live rows into a copy; the served index is left as it is
+        live = [(seg.counts[seg.alive], seg.squares[seg.alive]) for seg in index.segments if seg.alive.any()]
+        if not live:
+            raise ValueError("❌ Nothing to save: index is empty")
+        counts = sp.vstack([c for c, _ in live]).tocsr()
+        squares = sp.vstack([q for _, q in live]).tocsr()
+        _save_csr(path, counts)
+        # Same sparsity as counts, so only the values are stored
+        np.save(os.path.join(path, "squares.npy"), squares.data)
+        manifest["shape"] = list(counts.shape)
+        manifest["n_features"] = index.n_features
+        np.save(os.path.join(path, "df.npy"), index.df)
+        documents = index.documents
+
+    else:
+        vectors = store.index.vectors.vectors
+        np.save(os.path.join(path, "vectors.npy"), vectors)
+        manifest["dim"] = int(vectors.shape[1])
+        manifest["model"] = store.index.embedder.model_name
+
+    _save_documents(path, documents)
+    manifest["n_rows"] = len(documents)
+
+    # Manifest last: its presence marks a complete snapshot
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def load_store(path: str, mmap: bool = True, embedder=None):
+    """Rebuild a VectorStore from a snapshot directory"""
+    from .vector_store import VectorStore
+    import scipy.sparse as sp
+
+    manifest_path = os.path.join(path, "manifest.json")
+    if not os.path.exists(manifest_path):
+        raise ValueError(f"❌ No snapshot found at {path}")
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") not in READABLE_VERSIONS:
+        raise ValueError(f"❌ Unsupported snapshot version {manifest.get('format_version')}")
+
+    mmap_mode = "r" if mmap else None
+    backend = manifest["backend"]
+    documents = _load_documents(path)
+
+    if backend == "tfidf":
+        store = VectorStore(backend="tfidf")
+        with open(os.path.join(path, "vocabulary.json"), "r", encoding="utf-8") as f:
+            store.vectorizer.vocabulary_ = json.load(f)
+        store.vectorizer.idf_ = np.load(os.path.join(path, "idf.npy"))
+        store.tfidf_matrix = _load_csr(path, manifest["shape"], mmap_mode, sp)
+
+    elif backend == "incremental":
+        from .incremental_index import Segment
+        store = VectorStore(backend="incremental")
+        index = store.index
+        if index.n_features != manifest["n_features"]:
+            raise ValueError("❌ Snapshot hashing width does not match this build")
+        counts = _load_csr(path, manifest["shape"], mmap_mode, sp)
+        squares = None
+        squares_path = os.path.join(path, "squares.npy")
+        if os.path.exists(squares_path):
+            squares = sp.csr_matrix(
+                (np.load(squares_path, mmap_mode=mmap_mode), counts.indices, counts.indptr),
+                shape=counts.shape, copy=False
+            )
+        segment = Segment(counts, documents, squares)
+        index.segments = [segment]
+        # df is updated in place on add/remove, so it must be a private copy
+        index.df = np.array(np.load(os.path.join(path, "df.npy")))
+        index.n_live = len(documents)
+        for row, doc in enumerate(documents):
+            if doc.url:
+                index._url_rows.setdefault(doc.url, []).append((segment, row))
+
+    else:
+        if embedder is None or embedder.should_use_tfidf():
+            raise ValueError("❌ Dense snapshot needs a dense EmbeddingRouter")
+        if embedder.model_name != manifest["model"]:
+            raise ValueError(f"❌ Snapshot was built with {manifest['model']}")
+        store = VectorStore(embedder=embedder)
+        store.index.vectors.reset(np.load(os.path.join(path, "vectors.npy"), mmap_mode=mmap_mode))
+        store.index.docs = list(documents)
+
+    store.chunk_size = manifest["chunk_size"]
+    store.chunk_overlap = manifest["chunk_overlap"]
+    store.passages = documents
+    if store.bm25 is not None:
+        store.bm25.add(documents, [store._doc_text(d) for d in documents])
+
+    print(f"✅ Loaded {len(documents)} documents from snapshot ({backend})")
+    return store
+
+
+def _save_csr(path: str, matrix):
+    np.save(os.path.join(path, "data.npy"), matrix.data)
+    np.save(os.path.join(path, "indices.npy"), matrix.indices)
+    np.save(os.path.join(path, "indptr.npy"), matrix.indptr)
+
+
+def _load_csr(path: str, shape, mmap_mode: Optional[str], sp):
+    arrays = [np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in ("data", "indices", "indptr")]
+    return sp.csr_matrix(tuple(arrays), shape=tuple(shape), copy=False)
+
+
+def _save_documents(path: str, documents: List[Article]):
+    """articles.jsonl holds each parent once; rows.jsonl maps index rows to parents/passages"""
+    parents = {}
+    with open(os.path.join(path, "articles.jsonl"), "w", encoding="utf-8") as articles_file, \
+         open(os.path.join(path, "rows.jsonl"), "w", encoding="utf-8") as rows_file:
+        for doc in documents:
+            parent = doc.article if isinstance(doc, Passage) else doc
+            if id(parent) not in parents:
+                parents[id(parent)] = len(parents)
+                articles_file.write(json.dumps(parent.to_dict()) + "\n")
+            row: Tuple = (parents[id(parent)],)
+            if isinstance(doc, Passage):
+                row = (parents[id(parent)], doc.chunk_index, doc.processed_text)
+            rows_file.write(json.dumps(row) + "\n")
+
+
+def _load_documents(path: str) -> List[Article]:
+    with open(os.path.join(path, "articles.jsonl"), "r", encoding="utf-8") as f:
+        parents = [Article.from_dict(json.loads(line)) for line in f if line.strip()]
+    documents = []
+    with open(os.path.join(path, "rows.jsonl"), "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            parent = parents[row[0]]
+            documents.append(Passage(parent, row[2], row[1]) if len(row) == 3 else parent)
+    return documents
@@ -0,0 +1,145 @@
+"""
+Per-Session Vector Store Manager
+Gives every UI session its own index, bounded by count, idle time and memory
+"""
+
+import os
+import time
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Union
+
+from .article import Article, fingerprint
+from .vector_store import VectorStore
+
+
+class VectorStoreManager:
+    """Thread-safe LRU of session-keyed VectorStores"""
+
+    def __init__(
+        self,
+        max_stores: Optional[int] = None,
+        idle_seconds: Optional[int] = None,
+        max_memory_mb: Optional[int] = None
+    ):
+        self.max_stores = max_stores if max_stores is not None else int(os.getenv("VECTOR_STORE_MAX_SESSIONS", "32"))
+        self.idle_seconds = idle_seconds if idle_seconds is not None else int(os.getenv("VECTOR_STORE_IDLE_SECONDS", "1800"))
+        max_mb = max_memory_mb if max_memory_mb is not None else int(os.getenv("VECTOR_STORE_MAX_MB", "512"))
+        self.max_memory_bytes = max_mb * 1024 * 1024
+
+        # Sessions share one embedding model rather than loading it per store
+        self.embedder = None
+        if os.getenv("EMBEDDING_BACKEND", "tfidf").lower() == "dense":
+            from .llm_router import EmbeddingRouter
+            self.embedder = EmbeddingRouter()
+
+        # Optional snapshot directory: indexes are saved per article set, so an evicted
+        # session (or another worker process) reloads instead of re-indexing
+        self.snapshot_path = os.getenv("VECTOR_STORE_SNAPSHOT", "")
+        self.snapshot_keep = int(os.getenv("VECTOR_STORE_SNAPSHOT_KEEP", "64"))
+
+        self._stores: "OrderedDict[str, VectorStore]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+        print("✅ Vector Store Manager: Ready")
+
+    def get(self, session_id: str, articles: Optional[List[Union[Article, Dict]]] = None) -> VectorStore:
+        """
+        Return this session's store, creating it (and evicting others) as needed
+        Pass the session's articles to (re)index them when the store holds anything else
+        """
+        now = time.time()
+        with self._lock:
+            store = self._stores.get(session_id)
+            if store is None:
+                store = VectorStore(embedder=self.embedder)
+                self._stores[session_id] = store
+            self._stores.move_to_end(session_id)
+            self._last_used[session_id] = now
+            self._evict(now, keep=session_id)
+
+        if not articles:
+            return store
+        fp = fingerprint(articles)
+        if fingerprint(store.documents) == fp:
+            return store
+
+        # Index outside the manager lock so other sessions are not blocked
+        store = self._load_snapshot(fp) or self._build(store, articles, fp)
+        with self._lock:
+            self._stores[session_id] = store
+        return store
+
+    def _load_snapshot(self, fp: str) -> Optional[VectorStore]:
+        if not self.snapshot_path:
+            return None
+        path = os.path.join(self.snapshot_path, fp)
+        if not os.path.exists(os.path.join(path, "manifest.json")):
+            return None
+        try:
+            store = VectorStore.load(path, embedder=self.embedder)
+            os.utime(path)  # recency for pruning
+            return store
+        except Exception as e:
+            print(f"⚠️ Snapshot load failed: {e}")
+            return None
+
+    def _build(self, store: VectorStore, articles: List[Union[Article, Dict]], fp: str) -> VectorStore:
+        store.add_documents(articles)
+        if self.snapshot_path and store.documents:
+            try:
+                store.save(os.path.join(self.snapshot_path, fp))
+                self._prune_snapshots()
+            except Exception as e:
+                print(f"⚠️ Snapshot save failed: {e}")
+        return store
+
+    def _prune_snapshots(self):
+        """Keep the most recent snapshot_keep article-set snapshots"""
+        entries = [os.path.join(self.snapshot_path, name) for name in os.listdir(self.snapshot_path)]
+        entries = [e for e in entries if os.path.isdir(e)]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for stale in entries[self.snapshot_keep:]:
+            shutil.rmtree(stale, ignore_errors=True)
+
+    def release(self, session_id: str):
+        """Drop a session's index explicitly (e.g. on New Search / Clear)"""
+        with self._lock:
+            self._stores.pop(session_id, None)
+            self._last_used.pop(session_id, None)
+
+    def _evict(self, now: float, keep: str):
+        # Idle sessions first
+        for session_id in list(self._stores):
+            if session_id != keep and now - self._last_used[session_id] > self.idle_seconds:
+                self._drop(session_id)
+
+        # Then least recently used over the count / memory budgets
+        while len(self._stores) > self.max_stores or (
+            len(self._stores) > 1 and self._total_bytes() > self.max_memory_bytes
+        ):
+            oldest = next(iter(self._stores))
+            if oldest == keep:
+                break
+            self._drop(oldest)
+
+    def _drop(self, session_id: str):
+        self._stores.pop(session_id, None)
+        self._last_used.pop(session_id, None)
+        self.evictions += 1
+
+    def _total_bytes(self) -> int:
+        return sum(store.memory_bytes() for store in self._stores.values())
+
+    def stats(self) -> Dict:
+        """Live sessions and memory per index"""
+        with self._lock:
+            per_session = {sid: store.memory_bytes() for sid, store in self._stores.items()}
+        return {
+            "sessions": len(per_session),
+            "evictions": self.evictions,
+            "total_bytes": sum(per_session.values()),
+            "per_session_bytes": per_session
+        }
@@ -3,8 +3,42 @@
 AI Summarization - Optimized for Speed
 """
 
-from typing import List, Dict
+import os
+import re
+import json
+import html
+import hashlib
+import threading
+from collections import OrderedDict, Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Union, Optional, Iterator, Tuple, Callable
+from .article import Article, fingerprint
 from .llm_router import LLMRouter
+from .prompt_builder import pack_articles
+from .signals import SignalScorer
+from .insight_store import InsightStore, SCHEMA_PROMPT, parse_json_object, validate_insight
+from .tokens import count_tokens, trim_to_tokens, trim_to_sentences
+
+SECTION_PATTERN = re.compile(r"^#{2,4}\s*\[(\d+)\]\s*$", re.MULTILINE)
+JSON_OBJECT_PATTERN = re.compile(r"\{.*\}")
+SENTIMENTS = ("bullish", "bearish", "neutral")
+
+INSIGHT_FORMAT = """Write:
+## {company} Analysis
+
+### Sentiment: [BULLISH/BEARISH/NEUTRAL]
+
+### Key Points
+• [3 specific findings]
+
+### Catalysts
+• [2 positive factors]
+
+### Risks
+• [2 concerns]
+
+### Recommendation
+[BUY/HOLD/SELL with reason]"""
 
 
 class Summarizer:
@@ -12,74 +46,480 @@ class Summarizer:
     
     def __init__(self):
         self.router = LLMRouter()
+        self.scorer = SignalScorer()
+        
+        # Input-token budgets per task (capped per model by the router)
+        self.budgets = {
+            "summary": int(os.getenv("SUMMARY_INPUT_TOKENS", "300")),
+            "insight": int(os.getenv("INSIGHT_INPUT_TOKENS", "700")),
+            "answer": int(os.getenv("QA_INPUT_TOKENS", "450"))
+        }
+        
+        # Batch summaries: concurrency cap, packing of short articles, per-article memo
+        self.concurrency = int(os.getenv("SUMMARY_CONCURRENCY", "4"))
+        self.pack = os.getenv("SUMMARY_PACK", "1") == "1"
+        self.pack_size = int(os.getenv("SUMMARY_PACK_SIZE", "4"))
+        self.pack_max_tokens = int(os.getenv("SUMMARY_PACK_MAX_TOKENS", "120"))
+        self.memo_size = int(os.getenv("SUMMARY_MEMO_SIZE", "500"))
+        self._memo: "OrderedDict[str, str]" = OrderedDict()
+        self._memo_lock = threading.Lock()
+        
+        # Map-reduce insight: per-chunk signal extraction over the whole corpus, then one reduce call
+        self.insight_mode = os.getenv("INSIGHT_MODE", "auto").lower()
+        self.mapreduce_min_articles = int(os.getenv("INSIGHT_MAPREDUCE_MIN_ARTICLES", "8"))
+        self.map_chunk_articles = int(os.getenv("INSIGHT_MAP_CHUNK_ARTICLES", "5"))
+        self.map_article_tokens = int(os.getenv("INSIGHT_MAP_ARTICLE_TOKENS", "180"))
+        # Separate from the summary memo so a large map phase does not evict summaries (or vice versa)
+        self.signals_memo_size = int(os.getenv("SIGNALS_MEMO_SIZE", "500"))
+        self._signals_memo: "OrderedDict[str, str]" = OrderedDict()
+        
+        # INSIGHT_OUTPUT=json: schema-validated insights, persisted per article fingerprint
+        self.structured_output = os.getenv("INSIGHT_OUTPUT", "markdown").lower() == "json"
+        # Opened on first structured insight, so markdown-only runs create no database file
+        self._insight_store = None
+        self._insight_store_lock = threading.Lock()
+        self._insight_store_failed = False
         print("✅ Summarizer: Ready")
     
     def get_current_provider(self) -> str:
         return self.router.get_current_provider()
     
-    def summarize_article(self, article: Dict) -> str:
+    def summarize_article(self, article: Union[Article, Dict]) -> str:
         """Quick article summary"""
-        title = article.get("title", "")
-        content = article.get("processed_text", "") or article.get("content", "") or article.get("description", "")
+        return self.summarize_articles([article])[0]
+    
+    def summarize_articles(self, articles: List[Union[Article, Dict]]) -> List[str]:
+        """
+        Summaries aligned with `articles`: memoized by URL + content hash,
+        short articles packed several to a prompt, calls run concurrently
+        """
+        articles = [Article.coerce(a) for a in articles]
+        results: List[Optional[str]] = [None] * len(articles)
+        todo = []
+        for i, article in enumerate(articles):
+            if not article.text or len(article.text) < 30:
+                results[i] = "Insufficient content."
+                continue
+            cached = self._memo_get(self._memo, self._summary_key(article))
+            if cached is not None:
+                results[i] = cached
+            else:
+                todo.append(i)
+        
+        if todo:
+            groups = self._group_for_packing(todo, articles)
+            workers = max(1, min(self.concurrency, len(groups)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                batches = pool.map(self._summarize_group, [[articles[i] for i in g] for g in groups])
+                for group, summaries in zip(groups, batches):
+                    for i, (summary, provider) in zip(group, summaries):
+                        results[i] = summary
+                        # Local-fallback text is not worth pinning; a provider may be back next rerun
+                        if provider != "Local":
+                            self._memo_set(self._memo, self._summary_key(articles[i]), summary, self.memo_size)
         
-        if not content or len(content) < 30:
-            return "Insufficient content."
+        return results
+    
+    def _group_for_packing(self, indices: List[int], articles: List[Article]) -> List[List[int]]:
+        if not self.pack or self.pack_size < 2:
+            return [[i] for i in indices]
+        short = [i for i in indices if count_tokens(articles[i].text) <= self.pack_max_tokens]
+        packed = set(short)
+        groups = [[i] for i in indices if i not in packed]
+        groups += [short[k:k + self.pack_size] for k in range(0, len(short), self.pack_size)]
+        return groups
+    
+    def _summarize_group(self, group: List[Article]) -> List[Tuple[str, str]]:
+        """(summary, provider) per article; runs on a worker thread"""
+        if len(group) == 1:
+            return [self._summarize_one(group[0])]
         
+        budget = self.router.input_budget(130 * len(group), self.budgets["summary"] * len(group))
+        per_article = max(40, budget // len(group))
+        blocks = "\n\n".join(
+            f"[{n}] {a.title}\n{trim_to_sentences(a.text, per_article)}" for n, a in enumerate(group, 1)
+        )
+        prompt = f"""Summarize each article in 3 bullet points (KEY, IMPACT, ACTION).
+Start each summary with its own header line exactly like: ### [1]
+
+{blocks}"""
+
+        response = self.router.generate(prompt=prompt, max_tokens=130 * len(group), temperature=0.2)
+        provider = self.router.last_provider()
+        sections = self._parse_sections(response, len(group))
+        # Anything the model skipped or mangled is summarized on its own
+        return [
+            (sections[n], provider) if n in sections else self._summarize_one(a)
+            for n, a in enumerate(group, 1)
+        ]
+    
+    @staticmethod
+    def _parse_sections(response: str, count: int) -> Dict[int, str]:
+        parts = SECTION_PATTERN.split(response or "")
+        sections = {}
+        # split() yields [preamble, n1, body1, n2, body2, ...]
+        for number, body in zip(parts[1::2], parts[2::2]):
+            n = int(number)
+            if 1 <= n <= count and body.strip():
+                sections[n] = body.strip()
+        return sections
+    
+    def _summarize_one(self, article: Article) -> Tuple[str, str]:
+        budget = self.router.input_budget(150, self.budgets["summary"])
         prompt = f"""Summarize in 3 bullet points:
-{title}
-{content[:1000]}
+{article.title}
+{trim_to_sentences(article.text, budget)}
 
 • KEY: 
 • IMPACT: 
 • ACTION:"""
 
-        return self.router.generate(prompt=prompt, max_tokens=150, temperature=0.2)
+        summary = self.router.generate(prompt=prompt, max_tokens=150, temperature=0.2)
+        return summary, self.router.last_provider()
+    
+    @staticmethod
+    def _summary_key(article: Article) -> str:
+        content_hash = hashlib.sha1(article.text.encode("utf-8")).hexdigest()
+        return f"{article.url}\0{content_hash}"
     
-    def generate_investment_insight(self, articles: List[Dict], company: str) -> str:
+    def _memo_get(self, memo: OrderedDict, key: str) -> Optional[str]:
+        with self._memo_lock:
+            value = memo.get(key)
+            if value is not None:
+                memo.move_to_end(key)
+            return value
+    
+    def _memo_set(self, memo: OrderedDict, key: str, value: str, size: int):
+        with self._memo_lock:
+            memo[key] = value
+            memo.move_to_end(key)
+            while len(memo) > size:
+                memo.popitem(last=False)
+    
+    def generate_investment_insight(self, articles: List[Union[Article, Dict]], company: str) -> str:
         """Generate investment analysis"""
         
         if not articles:
             return "No articles available."
         
-        # Compact article summaries
-        summaries = []
-        for i, a in enumerate(articles[:4], 1):
-            title = a.get("title", "")
-            content = a.get("processed_text", "") or a.get("content", "")
-            summaries.append(f"{i}. {title}\n{content[:300]}")
+        if not self.router.is_configured():
+            return self.offline_insight(articles, company)
         
-        articles_text = "\n\n".join(summaries)
+        insight = self.router.generate(prompt=self._insight_prompt(articles, company), max_tokens=600, temperature=0.3)
+        if self.router.last_provider() == "Local":
+            return self.offline_insight(articles, company)
+        return insight
+    
+    def stream_investment_insight(
+        self,
+        articles: List[Union[Article, Dict]],
+        company: str,
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> Iterator[str]:
+        """
+        Investment analysis, yielded as it is generated
+        In map-reduce mode the first token waits for signal extraction; `on_progress(done, total)`
+        reports it article by article
+        """
         
-        prompt = f"""Investment analysis for {company.upper()}:
+        if not articles:
+            yield "No articles available."
+            return
+        
+        if not self.router.is_configured():
+            yield self.offline_insight(articles, company)
+            return
+        
+        prompt = self._insight_prompt(articles, company, on_progress=on_progress)
+        # Same offline analysis as generate_investment_insight when providers fail
+        yield from self.router.generate_stream(
+            prompt=prompt, max_tokens=600, temperature=0.3,
+            fallback=lambda: self.offline_insight(articles, company)
+        )
+    
+    def preliminary_signals(self, articles: List[Union[Article, Dict]], company: str) -> Dict:
+        """Instant lexicon read (tone, facts, analyst actions) while the LLM works"""
+        return self.scorer.analyze(articles, company)
+    
+    def offline_insight(self, articles: List[Union[Article, Dict]], company: str) -> str:
+        """Insight from the lexicon scorer alone, used when no LLM is reachable"""
+        self.router.current_provider = "Local"
+        return self.scorer.render(self.scorer.analyze(articles, company), company)
+    
+    def generate_structured_insight(
+        self,
+        articles: List[Union[Article, Dict]],
+        company: str,
+        refresh: bool = False
+    ) -> Dict:
+        """
+        JSON insight (sentiment, key points, catalysts, risks, recommendation, confidence)
+        Validated with one repair retry; stored per company + article fingerprint and reused
+        """
+        articles = [Article.coerce(a) for a in articles]
+        article_fp = fingerprint(articles)
+        store = self._get_insight_store()
+        if store is not None and not refresh:
+            stored = store.get(company, article_fp)
+            if stored is not None:
+                return stored
+        
+        insight, provider = None, "Local"
+        if articles and self.router.is_configured():
+            instructions = f"Respond with JSON only, exactly this shape:\n{SCHEMA_PROMPT}"
+            # Replies that fail validation are not cached, or the same bad reply would come back next time
+            reply = self.router.generate(
+                prompt=self._insight_prompt(articles, company, instructions), max_tokens=500, temperature=0.1,
+                validate=self._valid_insight_reply
+            )
+            insight, errors = validate_insight(parse_json_object(reply))
+            if errors and self.router.last_provider() != "Local":
+                print(f"⚠️ Insight JSON invalid ({'; '.join(errors[:3])}), asking for a repair")
+                repair = f"""This reply was supposed to be JSON matching the schema below but has errors: {'; '.join(errors)}.
 
-{articles_text}
+Reply:
+{trim_to_tokens(reply, 600)}
 
-Write:
-## {company.upper()} Analysis
+Schema:
+{SCHEMA_PROMPT}
 
-### Sentiment: [BULLISH/BEARISH/NEUTRAL]
+Return only the corrected JSON."""
+                insight, errors = validate_insight(parse_json_object(
+                    self.router.generate(prompt=repair, max_tokens=500, temperature=0, validate=self._valid_insight_reply)
+                ))
+            provider = self.router.last_provider() if insight else "Local"
+        
+        if insight is None:
+            insight = self._offline_structured(articles, company)
+        
+        insight.update({
+            "company": company,
+            "fingerprint": article_fp,
+            "articles": len(articles),
+            "provider": provider
+        })
+        # Only model output is worth keeping; the lexicon result is recomputed for free
+        if store is not None and provider != "Local":
+            store.set(company, article_fp, insight, provider)
+        return insight
+    
+    def _get_insight_store(self) -> Optional[InsightStore]:
+        """The structured-insight store, opened on first use (None if it cannot be opened)"""
+        with self._insight_store_lock:
+            if self._insight_store is None and not self._insight_store_failed:
+                try:
+                    self._insight_store = InsightStore()
+                except Exception as e:
+                    self._insight_store_failed = True
+                    print(f"⚠️ Insight store disabled: {e}")
+            return self._insight_store
+    
+    @staticmethod
+    def _valid_insight_reply(reply: str) -> bool:
+        return validate_insight(parse_json_object(reply))[0] is not None
+    
+    def _offline_structured(self, articles: List[Article], company: str) -> Dict:
+        analysis = self.scorer.analyze(articles, company)
+        ranked = sorted(analysis["per_article"], key=lambda p: p["score"])
+        return {
+            "sentiment": analysis["sentiment"],
+            "key_points": analysis["facts"][:3] or ["No figures reported"],
+            "catalysts": [p["title"] for p in reversed(ranked) if p["score"] > 0][:2],
+            "risks": [p["title"] for p in ranked if p["score"] < 0][:2],
+            "recommendation": {"BULLISH": "BUY", "BEARISH": "SELL"}.get(analysis["sentiment"], "HOLD"),
+            "rationale": f"Offline lexicon tone {analysis['score']:+.2f} across {len(ranked)} articles",
+            "confidence": round(min(abs(analysis["score"]), 1.0) * 0.5, 2)
+        }
+    
+    @staticmethod
+    def render_insight(insight: Dict, company: str) -> str:
+        """Markdown for a structured insight; model text is HTML-escaped before display"""
+        esc = html.escape
+        lines = [
+            f"## {esc(company.upper())} Analysis",
+            "",
+            f"### Sentiment: {insight['sentiment']}",
+            "",
+            "### Key Points"
+        ]
+        lines += [f"• {esc(p)}" for p in insight["key_points"]]
+        lines += ["", "### Catalysts"] + ([f"• {esc(c)}" for c in insight["catalysts"]] or ["• None identified"])
+        lines += ["", "### Risks"] + ([f"• {esc(r)}" for r in insight["risks"]] or ["• None identified"])
+        lines += [
+            "",
+            "### Recommendation",
+            f"{insight['recommendation']} — {esc(insight['rationale'])} (confidence {insight['confidence']:.0%})"
+        ]
+        return "\n".join(lines)
+    
+    def _insight_prompt(
+        self,
+        articles: List[Union[Article, Dict]],
+        company: str,
+        instructions: Optional[str] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> str:
+        instructions = instructions or INSIGHT_FORMAT.format(company=company.upper())
+        if self._use_mapreduce(articles):
+            signals = self.extract_signals(articles, company, on_progress)
+            if signals:
+                return self._reduce_prompt(signals, len(articles), company, instructions)
+        
+        # Highest-value lead sentences, packed into the insight budget
+        packed = pack_articles(articles, self.router.input_budget(600, self.budgets["insight"]), company)
+        articles_text = packed.text
+        
+        prompt = f"""Investment analysis for {company.upper()}:
 
-### Key Points
-• [3 specific findings]
+{articles_text}
 
-### Catalysts
-• [2 positive factors]
+{instructions}"""
 
-### Risks
-• [2 concerns]
+        return prompt
+    
+    def _use_mapreduce(self, articles: List) -> bool:
+        if self.insight_mode == "single" or not self.router.has_providers():
+            return False
+        return self.insight_mode == "mapreduce" or len(articles) >= self.mapreduce_min_articles
+    
+    def extract_signals(
+        self,
+        articles: List[Union[Article, Dict]],
+        company: str,
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> List[Dict]:
+        """
+        Map step: sentiment, catalysts, risks and facts per article, extracted in
+        concurrent chunked calls and memoized per article
+        `on_progress(done, total)` is called (on the caller's thread) as chunks finish
+        """
+        articles = [Article.coerce(a) for a in articles]
+        articles = [a for a in articles if a.text and len(a.text) >= 30]
+        signals: List[Optional[Dict]] = [None] * len(articles)
+        todo = []
+        for i, article in enumerate(articles):
+            cached = self._memo_get(self._signals_memo, self._signals_key(article, company))
+            if cached is not None:
+                signals[i] = json.loads(cached)
+            else:
+                todo.append(i)
+        
+        if todo:
+            chunks = [todo[k:k + self.map_chunk_articles] for k in range(0, len(todo), self.map_chunk_articles)]
+            workers = max(1, min(self.concurrency, len(chunks)))
+            done = 0
+            if on_progress:
+                on_progress(done, len(todo))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                mapped = pool.map(lambda chunk: self._map_chunk([articles[i] for i in chunk], company), chunks)
+                for chunk, extracted in zip(chunks, mapped):
+                    for n, i in enumerate(chunk, 1):
+                        if n in extracted:
+                            signals[i] = extracted[n]
+                            self._memo_set(
+                                self._signals_memo, self._signals_key(articles[i], company),
+                                json.dumps(extracted[n]), self.signals_memo_size
+                            )
+                    done += len(chunk)
+                    if on_progress:
+                        on_progress(done, len(todo))
+        
+        return [s for s in signals if s]
+    
+    def _map_chunk(self, chunk: List[Article], company: str) -> Dict[int, Dict]:
+        blocks = "\n\n".join(
+            f"[{n}] {a.title}\n{trim_to_sentences(a.text, self.map_article_tokens)}" for n, a in enumerate(chunk, 1)
+        )
+        prompt = f"""Extract investment signals about {company.upper()} from each article.
+Reply with one JSON object per line and nothing else, e.g.
+{{"id": 1, "sentiment": "bullish", "catalysts": ["..."], "risks": ["..."], "facts": ["..."]}}
+sentiment is bullish, bearish or neutral; keep each list to at most 2 short phrases.
 
-### Recommendation
-[BUY/HOLD/SELL with reason]"""
+{blocks}"""
 
-        return self.router.generate(prompt=prompt, max_tokens=600, temperature=0.3)
+        response = self.router.generate(prompt=prompt, max_tokens=90 * len(chunk), temperature=0.1)
+        return self._parse_signals(response, len(chunk))
     
-    def answer_question(self, question: str, context: str, company: str) -> str:
-        """Quick Q&A response"""
+    @staticmethod
+    def _parse_signals(response: str, count: int) -> Dict[int, Dict]:
+        signals = {}
+        for line in (response or "").splitlines():
+            match = JSON_OBJECT_PATTERN.search(line)
+            if not match:
+                continue
+            try:
+                item = json.loads(match.group(0))
+                n = int(item.get("id", 0))
+            except (ValueError, TypeError, AttributeError):
+                continue
+            if not 1 <= n <= count:
+                continue
+            sentiment = str(item.get("sentiment", "")).lower()
+            signals[n] = {
+                "sentiment": sentiment if sentiment in SENTIMENTS else "neutral",
+                **{
+                    field: [str(x)[:120] for x in item.get(field) or [] if str(x).strip()][:3]
+                    for field in ("catalysts", "risks", "facts")
+                    if isinstance(item.get(field) or [], list)
+                }
+            }
+        return signals
+    
+    def _reduce_prompt(self, signals: List[Dict], total: int, company: str, instructions: str) -> str:
+        """Reduce step input: sentiment tally plus the most-cited catalysts, risks and facts"""
+        tally = Counter(s["sentiment"] for s in signals)
+        sections = []
+        for field, label in (("catalysts", "Catalysts"), ("risks", "Risks"), ("facts", "Facts")):
+            counts: Counter = Counter()
+            phrasing: Dict[str, str] = {}
+            for s in signals:
+                for item in s.get(field, []):
+                    key = " ".join(item.lower().split())
+                    counts[key] += 1
+                    phrasing.setdefault(key, item)
+            if counts:
+                lines = [f"- {phrasing[k]}" + (f" ({n} articles)" if n > 1 else "") for k, n in counts.most_common(8)]
+                sections.append(f"{label}:\n" + "\n".join(lines))
+        
+        budget = self.router.input_budget(600, self.budgets["insight"])
+        evidence = trim_to_tokens("\n\n".join(sections), budget)
         
-        prompt = f"""About {company}: {context[:1500]}
+        return f"""Investment analysis for {company.upper()} from {len(signals)} of {total} articles.
+Article sentiment: {tally['bullish']} bullish, {tally['neutral']} neutral, {tally['bearish']} bearish.
+
+{evidence}
+
+{instructions}"""
+    
+    @staticmethod
+    def _signals_key(article: Article, company: str) -> str:
+        return f"signals\0{company.lower()}\0{Summarizer._summary_key(article)}"
+    
+    def answer_question(self, question: str, context: str, company: str, fingerprint: Optional[str] = None) -> str:
+        """Quick Q&A response; pass the article-set fingerprint to reuse answers to similar questions"""
+        return self.router.generate(**self._answer_request(question, context, company, fingerprint))
+    
+    async def aanswer_question(self, question: str, context: str, company: str, fingerprint: Optional[str] = None) -> str:
+        """answer_question for async callers: per-provider timeouts and hedging (LLM_HEDGE=1)"""
+        return await self.router.agenerate(**self._answer_request(question, context, company, fingerprint))
+    
+    def stream_answer(self, question: str, context: str, company: str, fingerprint: Optional[str] = None) -> Iterator[str]:
+        """Q&A response, yielded as it is generated"""
+        yield from self.router.generate_stream(**self._answer_request(question, context, company, fingerprint))
+    
+    def _answer_request(self, question: str, context: str, company: str, fingerprint: Optional[str]) -> Dict:
+        # Context arrives budgeted from VectorStore.get_context; this is only a safety cap
+        budget = self.router.input_budget(300, self.budgets["answer"])
+        prompt = f"""About {company}: {trim_to_tokens(context, budget)}
 
 Question: {question}
 
 Answer concisely and specifically. Be helpful."""
 
-        return self.router.generate(prompt=prompt, max_tokens=300, temperature=0.3)
\ No newline at end of file
+        return {
+            "prompt": prompt,
+            "max_tokens": 300,
+            "temperature": 0.3,
+            "cache_scope": f"{company.lower()}:{fingerprint}" if fingerprint else None,
+            "cache_query": question
+        }
\ No newline at end of file
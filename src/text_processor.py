@@ -3,47 +3,96 @@
 Text Processing Module
 """
 
+import os
 import re
 import html
-from typing import List, Dict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Iterable, Iterator, Union, Optional
+
+from .article import Article
+
+URL_PATTERN = re.compile(r'https?://\S+')
+
+
+def clean_text(text: str) -> str:
+    """Clean and normalize text"""
+    if not text:
+        return ""
+    
+    if "&" in text:
+        text = html.unescape(text)
+    # split()/join collapses and strips whitespace in a single C-level pass
+    return " ".join(URL_PATTERN.sub('', text).split())
+
+
+def count_words(text: str) -> int:
+    """Word count of cleaned text (single-spaced, stripped) without splitting"""
+    return text.count(" ") + 1 if text else 0
+
+
+def chunk_words(text: str, size: int = 60, overlap: int = 15) -> List[str]:
+    """Split text into overlapping word windows"""
+    words = text.split()
+    if len(words) <= size:
+        return [text] if text else []
+    step = max(1, size - overlap)
+    return [" ".join(words[i:i + size]) for i in range(0, len(words) - overlap, step)]
+
+
+def _combine(article: Article) -> str:
+    return " ".join(p for p in (article.title, article.description, article.content) if p)
+
+
+def _clean_chunk(texts: List[str]) -> List[str]:
+    """Process-pool worker: clean a chunk of raw article texts"""
+    return [clean_text(t) for t in texts]
 
 
 class TextProcessor:
     """Processes text for AI analysis"""
     
+    # Below this many articles the pool's startup cost outweighs the gain
+    POOL_THRESHOLD = 2000
+    
     def __init__(self):
         print("✅ Text Processor initialized")
     
     def clean_text(self, text: str) -> str:
         """Clean and normalize text"""
-        if not text:
-            return ""
-        
-        text = html.unescape(text)
-        text = re.sub(r'https?://\S+', '', text)
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
+        return clean_text(text)
     
-    def process_articles(self, articles: List[Dict]) -> List[Dict]:
+    def process_articles(self, articles: Iterable[Union[Article, Dict]]) -> List[Article]:
         """Process articles for analysis"""
-        processed = []
-        
+        return list(self.iter_process(articles))
+    
+    def iter_process(self, articles: Iterable[Union[Article, Dict]]) -> Iterator[Article]:
+        """Process articles one at a time as they stream in"""
         for article in articles:
-            parts = []
-            if article.get("title"):
-                parts.append(article["title"])
-            if article.get("description"):
-                parts.append(article["description"])
-            if article.get("content"):
-                parts.append(article["content"])
-            
-            combined = " ".join(parts)
-            cleaned = self.clean_text(combined)
-            
-            processed.append({
-                **article,
-                "processed_text": cleaned,
-                "word_count": len(cleaned.split())
-            })
+            article = Article.coerce(article)
+            # Set in place: no per-stage copy of the record
+            article.processed_text = clean_text(_combine(article))
+            yield article
+    
+    def process_batch(
+        self,
+        articles: Iterable[Union[Article, Dict]],
+        workers: Optional[int] = None,
+        chunk_size: int = 1000
+    ) -> List[Article]:
+        """Bulk processing for backfills; workers > 1 opts into a process pool"""
+        batch = [Article.coerce(a) for a in articles]
+        texts = [_combine(a) for a in batch]
+        
+        if workers and workers > 1 and len(batch) >= self.POOL_THRESHOLD:
+            chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+            cleaned = []
+            with ProcessPoolExecutor(max_workers=min(workers, os.cpu_count() or 1)) as pool:
+                for result in pool.map(_clean_chunk, chunks):
+                    cleaned.extend(result)
+        else:
+            cleaned = [clean_text(t) for t in texts]
+        
+        for article, text in zip(batch, cleaned):
+            article.processed_text = text
         
-        return processed
\ No newline at end of file
+        return batch
@@ -0,0 +1,77 @@
+"""
+Local Token Counting
+Uses tiktoken when installed; otherwise a regex estimate that tracks BPE
+counts for English news text closely enough for budgeting.
+"""
+
+import re
+from typing import List, Optional
+
+PIECE_PATTERN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+
+def count_tokens(text: str) -> int:
+    """Approximate prompt tokens for `text`"""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    total = 0
+    for piece in PIECE_PATTERN.findall(text):
+        # Long words split into several BPE pieces; digits group in threes
+        if piece[0].isdigit():
+            total += (len(piece) + 2) // 3
+        else:
+            total += 1 + max(0, len(piece) - 1) // 6
+    return total
+
+
+def trim_to_tokens(text: str, max_tokens: int, suffix: Optional[str] = "…") -> str:
+    """Cut `text` to at most `max_tokens`, preferring a word boundary"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    words = text.split()
+    lo, hi = 0, len(words)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count_tokens(" ".join(words[:mid])) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    trimmed = " ".join(words[:lo])
+    return trimmed + suffix if suffix and trimmed else trimmed
+
+
+# Split on the whitespace after a sentence end, so closing quotes/brackets stay with their sentence
+_CLOSERS = "\"'\u201d\u2019)\\]"
+SENTENCE_PATTERN = re.compile(
+    rf"(?:(?<=[.!?])|(?<=[.!?][{_CLOSERS}])|(?<=[.!?][{_CLOSERS}]{{2}}))\s+(?=[A-Z0-9\"'\u201c\u2018(\[$])"
+)
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split prose at sentence ends (keeps abbreviations like 'U.S. stocks' mostly intact)"""
+    return [s.strip() for s in SENTENCE_PATTERN.split(text or "") if s.strip()]
+
+
+def trim_to_sentences(text: str, max_tokens: int, suffix: Optional[str] = "…") -> str:
+    """Keep whole sentences up to `max_tokens`; cuts inside a sentence only if the first one is too long"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    kept = []
+    used = 0
+    for sentence in split_sentences(text):
+        cost = count_tokens(sentence)
+        if used + cost > max_tokens:
+            break
+        kept.append(sentence)
+        used += cost
+    if not kept:
+        return trim_to_tokens(text, max_tokens, suffix)
+    return " ".join(kept)
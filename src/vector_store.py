@@ -1,19 +1,90 @@
 # src/vector_store.py
 """
-Vector Store with TF-IDF Search
+Vector Store with TF-IDF or Dense Embedding Search
 """
 
-from typing import List, Dict
+import os
+import threading
+from datetime import datetime, timezone
+from functools import wraps
+from typing import List, Dict, Iterable, Union, Optional
 import numpy as np
 
+from .article import Article, Passage
+from .bm25 import BM25Index
+from .text_processor import chunk_words
+from .tokens import count_tokens, trim_to_tokens
+
+
+def synchronized(method):
+    """Serialize access to a store shared between Streamlit script threads"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def parent_articles(hits: Iterable[Article]) -> List[Article]:
+    """Collapse passages to their articles, keeping first-seen order"""
+    seen = set()
+    parents = []
+    for hit in hits:
+        parent = hit.article if isinstance(hit, Passage) else hit
+        if id(parent) not in seen:
+            seen.add(id(parent))
+            parents.append(parent)
+    return parents
+
 
 class VectorStore:
-    """Document store with TF-IDF search"""
+    """Document store with TF-IDF or dense search"""
     
-    def __init__(self):
-        self.documents: List[Dict] = []
+    def __init__(self, incremental: Optional[bool] = None, embedder=None, backend: Optional[str] = None):
+        # Index rows: passages (or whole articles); `documents` exposes their parents
+        self.passages: List[Article] = []
         self.tfidf_matrix = None
         self.vectorizer = None
+        self.index = None
+        self._lock = threading.RLock()
+        
+        # Hybrid retrieval: BM25 keyword ranks fused with vector ranks (RRF)
+        self.bm25 = BM25Index() if os.getenv("RETRIEVAL_MODE", "hybrid").lower() == "hybrid" else None
+        self.rrf_k = int(os.getenv("RRF_K", "60"))
+        self.recency_weight = float(os.getenv("RECENCY_WEIGHT", "0.25"))
+        self.recency_half_life_days = float(os.getenv("RECENCY_HALF_LIFE_DAYS", "3"))
+        
+        # Articles are indexed as overlapping passages (CHUNK_WORDS=0 indexes whole articles)
+        self.chunk_size = int(os.getenv("CHUNK_WORDS", "60"))
+        self.chunk_overlap = int(os.getenv("CHUNK_OVERLAP", "15"))
+        self.context_tokens = int(os.getenv("QA_CONTEXT_TOKENS", "240"))
+        
+        # backend="tfidf"/"incremental" forces a sparse index whatever EMBEDDING_BACKEND says (snapshot restore)
+        if backend in ("tfidf", "incremental"):
+            embedder = None
+            incremental = backend == "incremental"
+        # EMBEDDING_BACKEND=dense selects the FAISS path; pass a shared embedder to avoid reloading the model
+        elif embedder is None and os.getenv("EMBEDDING_BACKEND", "tfidf").lower() == "dense":
+            from .llm_router import EmbeddingRouter
+            embedder = EmbeddingRouter()
+        
+        if embedder is not None and not embedder.should_use_tfidf():
+            from .dense_index import DenseDocumentIndex
+            self.index = DenseDocumentIndex(embedder)
+            print("✅ Vector Store: Ready (dense)")
+            return
+        
+        if incremental is None:
+            incremental = os.getenv("VECTOR_STORE_INCREMENTAL", "0") == "1"
+        
+        if incremental:
+            try:
+                from .incremental_index import IncrementalIndex
+                self.index = IncrementalIndex()
+                print("✅ Vector Store: Ready (incremental)")
+            except ImportError:
+                print("⚠️ Vector Store: sklearn not installed")
+            return
         
         try:
             from sklearn.feature_extraction.text import TfidfVectorizer
@@ -26,113 +97,278 @@ class VectorStore:
         except ImportError:
             print("⚠️ Vector Store: sklearn not installed")
     
-    def add_documents(self, documents: List[Dict]):
-        """Add documents and build search index"""
-        self.documents = documents
+    @synchronized
+    def add_documents(self, documents: Iterable[Union[Article, Dict]]):
+        """Replace the corpus and build search index (accepts lists or streams)"""
+        if self.bm25 is not None:
+            self.bm25.clear()
+        
+        if self.index is not None:
+            self.index.clear()
+            self.passages = []
+            self.add(documents)
+            return
         
-        if not documents:
+        self.passages = []
+        
+        # Build text corpus in the same pass that consumes the stream
+        texts = []
+        for doc in documents:
+            for passage in self._passages(Article.coerce(doc)):
+                self.passages.append(passage)
+                texts.append(self._doc_text(passage))
+        
+        if not self.passages:
             print("⚠️ No documents to index")
             return
         
+        if self.bm25 is not None:
+            self.bm25.add(self.passages, texts)
+        
         if not self.vectorizer:
             print("⚠️ No vectorizer available")
             return
         
-        # Build text corpus
-        texts = []
-        for doc in documents:
-            text_parts = []
-            if doc.get("title"):
-                text_parts.append(doc["title"])
-            if doc.get("description"):
-                text_parts.append(doc["description"])
-            if doc.get("processed_text"):
-                text_parts.append(doc["processed_text"])
-            elif doc.get("content"):
-                text_parts.append(doc["content"])
-            
-            combined = " ".join(text_parts)
-            texts.append(combined if combined else "empty")
-        
         try:
             self.tfidf_matrix = self.vectorizer.fit_transform(texts)
             print(f"✅ Indexed {len(texts)} documents")
         except Exception as e:
             print(f"⚠️ Indexing error: {e}")
     
-    def search(self, query: str, top_k: int = 3) -> List[Dict]:
-        """Search for relevant documents"""
-        if not self.documents:
-            return []
+    @synchronized
+    def add(self, documents: Iterable[Union[Article, Dict]]):
+        """Grow the corpus; only the new documents are indexed in incremental mode"""
+        docs = [p for d in documents for p in self._passages(Article.coerce(d))]
+        if not docs:
+            return
         
-        # If TF-IDF available, use it
-        if self.tfidf_matrix is not None and self.vectorizer:
+        if self.index is None:
+            # Full refit fallback; re-added URLs replace their older copies, as in the other indexes
+            urls = {d.url for d in docs if d.url}
+            self.add_documents([p for p in self.passages if p.url not in urls] + docs)
+            return
+        
+        texts = [self._doc_text(d) for d in docs]
+        self.index.add(docs, texts)
+        if self.bm25 is not None:
+            # Re-added URLs replace their older copies, as in the vector index
+            self.bm25.remove_urls({d.url for d in docs if d.url})
+            self.bm25.add(docs, texts)
+        self.passages = self.index.documents
+        print(f"✅ Indexed {len(docs)} documents ({len(self.passages)} total)")
+    
+    @synchronized
+    def remove(self, url: str) -> int:
+        """Drop every article with this URL; returns the number of articles removed"""
+        removed = sum(1 for d in self.documents if d.url == url)
+        if self.index is not None:
+            self.index.remove(url)
+            if self.bm25 is not None:
+                self.bm25.remove(url)
+            self.passages = self.index.documents
+            return removed
+        
+        if removed:
+            self.add_documents([d for d in self.passages if d.url != url])
+        return removed
+    
+    def memory_bytes(self) -> int:
+        """Approximate footprint of the index plus document text"""
+        total = sum(
+            len(d.title) + len(d.description) + len(d.content) + len(d._processed_text or "")
+            for d in self.passages
+        )
+        if self.index is not None:
+            total += self.index.memory_bytes()
+        elif self.tfidf_matrix is not None:
+            m = self.tfidf_matrix
+            total += m.data.nbytes + m.indices.nbytes + m.indptr.nbytes
+        return total
+    
+    @synchronized
+    def save(self, path: str):
+        """Write a versioned snapshot (vocabulary, raw CSR/vector arrays, documents) to `path`"""
+        from .snapshot import save_store
+        save_store(self, path)
+        print(f"✅ Saved {len(self.documents)} documents to {path}")
+    
+    @classmethod
+    def load(cls, path: str, mmap: bool = True, embedder=None) -> "VectorStore":
+        """Load a snapshot; with mmap=True the index arrays are read-only memory maps shared between processes"""
+        from .snapshot import load_store
+        return load_store(path, mmap=mmap, embedder=embedder)
+    
+    def _passages(self, article: Article) -> List[Article]:
+        """Split an article into overlapping passages for chunk-level retrieval"""
+        if self.chunk_size <= 0 or isinstance(article, Passage):
+            return [article]
+        chunks = chunk_words(article.processed_text, self.chunk_size, self.chunk_overlap)
+        if len(chunks) <= 1:
+            return [article]
+        return [Passage(article, chunk, i) for i, chunk in enumerate(chunks)]
+    
+    def _doc_text(self, doc: Article) -> str:
+        combined = " ".join(p for p in (doc.title, doc.description, doc.text) if p)
+        return combined if combined else "empty"
+    
+    @property
+    def documents(self) -> List[Article]:
+        """Indexed articles, each once, in index order"""
+        return parent_articles(self.passages)
+    
+    @synchronized
+    def search(self, query: str, top_k: int = 3) -> List[Article]:
+        """Search for relevant articles (each at most once, however many passages matched)"""
+        if not self.passages:
+            return []
+        # Several passages can belong to one article; over-fetch before collapsing
+        hits = self._search_passages(query, top_k * 3)
+        return parent_articles(hits)[:top_k] or self.documents[:top_k]
+    
+    def _search_passages(self, query: str, top_k: int) -> List[Article]:
+        """Ranked index rows (passages) for a query"""
+        if self.bm25 is None:
+            return self._vector_search(query, top_k)
+        pool = max(top_k * 5, 50)
+        return self._fuse(
+            [self._vector_search(query, pool), self.bm25.search(query, pool)],
+            top_k
+        )
+    
+    def _vector_search(self, query: str, top_k: int) -> List[Article]:
+        """Ranked hits from the active vector backend"""
+        if self.index is not None:
             try:
-                from sklearn.metrics.pairwise import cosine_similarity
-                
-                query_vec = self.vectorizer.transform([query])
-                similarities = cosine_similarity(query_vec, self.tfidf_matrix).flatten()
-                
-                # Get top results
-                top_indices = np.argsort(similarities)[-top_k:][::-1]
-                results = [self.documents[idx] for idx in top_indices]
-                return results
-                
+                return self.index.search(query, top_k)
             except Exception as e:
                 print(f"⚠️ Search error: {e}")
+            return []
+        
+        if self.tfidf_matrix is None or not self.vectorizer:
+            return []
+        
+        try:
+            # Rows are L2-normalized, so the dot product is the cosine similarity
+            query_vec = self.vectorizer.transform([query])
+            similarities = (self.tfidf_matrix @ query_vec.T).toarray().ravel()
+            hits = np.flatnonzero(similarities > 0)
+            if not len(hits):
+                return []
+            k = min(top_k, len(hits))
+            top = hits[np.argpartition(-similarities[hits], k - 1)[:k]]
+            top = top[np.argsort(-similarities[top])]
+            return [self.passages[idx] for idx in top]
+        except Exception as e:
+            print(f"⚠️ Search error: {e}")
+            return []
+    
+    def _fuse(self, rankings: List[List[Article]], top_k: int) -> List[Article]:
+        """Reciprocal-rank fusion with an optional recency boost"""
+        scores: Dict[int, float] = {}
+        docs: Dict[int, Article] = {}
+        for ranking in rankings:
+            for rank, doc in enumerate(ranking):
+                key = id(doc)
+                docs[key] = doc
+                scores[key] = scores.get(key, 0.0) + 1.0 / (self.rrf_k + rank + 1)
+        
+        if not scores:
+            return []
+        
+        keys = list(scores)
+        fused = np.fromiter((scores[k] for k in keys), dtype=np.float64, count=len(keys))
+        
+        if self.recency_weight:
+            now = datetime.now(timezone.utc)
+            ages = np.array([self._age_days(docs[k], now) for k in keys])
+            boost = np.where(np.isnan(ages), 0.0, 0.5 ** (np.nan_to_num(ages) / self.recency_half_life_days))
+            fused *= 1 + self.recency_weight * boost
         
-        # Fallback: return first documents
-        return self.documents[:top_k]
+        k = min(top_k, len(keys))
+        top = np.argpartition(-fused, k - 1)[:k]
+        top = top[np.argsort(-fused[top])]
+        return [docs[keys[i]] for i in top]
     
-    def get_context(self, question: str) -> str:
+    @staticmethod
+    def _age_days(doc: Article, now: datetime) -> float:
+        published = doc.published_at
+        if published is None:
+            return float("nan")
+        if published.tzinfo is None:
+            published = published.replace(tzinfo=timezone.utc)
+        return max(0.0, (now - published).total_seconds() / 86400)
+    
+    @synchronized
+    def get_context(self, question: str, max_tokens: Optional[int] = None, top_k: int = 6) -> str:
         """
         Get context for Q&A - ALWAYS returns something useful
-        This is the key fix!
+        Packs the best-ranked passages into a token budget, grouped by article
         """
         
         # If no documents, return empty
-        if not self.documents:
+        if not self.passages:
             print("⚠️ No documents available for context")
             return ""
         
-        # Try to search for relevant docs
-        docs = self.search(question, top_k=3)
+        budget = max_tokens or self.context_tokens
         
-        # If search returned nothing, just use all documents
-        if not docs:
-            docs = self.documents[:3]
-            print(f"ℹ️ Using all {len(docs)} documents as context")
+        # Try to search for relevant passages
+        hits = self._search_passages(question, top_k)
         
-        # Build context from documents
-        context_parts = []
+        # If search returned nothing, just use the first passages
+        if not hits:
+            hits = self.passages[:top_k]
+            print(f"ℹ️ Using first {len(hits)} passages as context")
         
-        for i, doc in enumerate(docs, 1):
-            source = doc.get('source', 'Unknown Source')
-            title = doc.get('title', 'Article')
-            date = doc.get('published_at', '')
-            
-            # Get content - try multiple fields
-            content = ""
-            if doc.get('processed_text'):
-                content = doc['processed_text']
-            elif doc.get('content'):
-                content = doc['content']
-            elif doc.get('description'):
-                content = doc['description']
+        # Group passages under their article, keeping rank order of first appearance
+        groups: Dict[int, List[Article]] = {}
+        for hit in hits:
+            parent = hit.article if isinstance(hit, Passage) else hit
+            groups.setdefault(id(parent), []).append(hit)
+        
+        context_parts = []
+        separator = count_tokens("\n\n")
+        used = 0
+        for i, passages in enumerate(groups.values(), 1):
+            first = passages[0]
+            date = first.published_at.strftime("%b %d, %Y") if first.published_at else "undated"
+            header = f"[{i}] {first.source or 'Unknown Source'}, {date}"
+            # Passage 0 / whole articles already open with the title
+            if all(getattr(p, "chunk_index", 0) != 0 for p in passages):
+                header += f" - {first.title or 'Article'}"
             
-            # Truncate if too long
-            content = content[:1000] if content else "No content available"
+            block = f"{header}\n{self._join_passages(passages) or 'No content available'}"
+            cost = count_tokens(block)
+            # Blocks after the first are preceded by a blank-line separator
+            remaining = budget - used - (separator if context_parts else 0)
+            if cost > remaining:
+                # Trim to fit if enough room is left to say something useful
+                if remaining - count_tokens(header) < 30:
+                    continue
+                block = trim_to_tokens(block, remaining)
+                cost = count_tokens(block)
             
-            context_parts.append(f"""
-ARTICLE {i}:
-Source: {source}
-Date: {date}
-Title: {title}
-Content: {content}
-""")
+            used += cost + (separator if context_parts else 0)
+            context_parts.append(block)
         
-        full_context = "\n---\n".join(context_parts)
+        full_context = "\n\n".join(context_parts)
         
-        print(f"✅ Built context from {len(docs)} articles ({len(full_context)} chars)")
+        print(f"✅ Built context from {len(hits)} passages ({used} tokens)")
         
-        return full_context
\ No newline at end of file
+        return full_context
+    
+    def _join_passages(self, passages: List[Article]) -> str:
+        """Join passages of one article in order, dropping overlap between neighbours"""
+        passages = sorted(passages, key=lambda p: getattr(p, "chunk_index", 0))
+        parts = []
+        previous = None
+        for p in passages:
+            text = p.text
+            index = getattr(p, "chunk_index", None)
+            if previous is not None and index is not None and index == previous + 1:
+                text = " ".join(text.split()[self.chunk_overlap:])
+            elif parts:
+                text = "… " + text
+            parts.append(text)
+            previous = index
+        return " ".join(t for t in parts if t)
@@ -0,0 +1,112 @@
+"""PooledSession against a local stub HTTP server"""
+
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from src.http_session import PooledSession, parse_retry_after
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    hits = {}
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=None, headers=None):
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        count = StubHandler.hits[path] = StubHandler.hits.get(path, 0) + 1
+
+        if path == "/flaky":
+            if count <= 2:
+                self._send(503, {"status": "error"}, {"Retry-After": "0"})
+            else:
+                self._send(200, {"status": "ok"})
+        elif path == "/backoff":
+            if count == 1:
+                self._send(502, {"status": "error"})
+            else:
+                self._send(200, {"status": "ok"})
+        elif path == "/limited":
+            self._send(429, {"status": "error"}, {"Retry-After": "0"})
+        elif path == "/etag":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self._send(304)
+            else:
+                self._send(200, {"version": 1}, {"ETag": '"v1"'})
+        else:
+            self._send(404, {"status": "error"})
+
+
+@pytest.fixture
+def server():
+    StubHandler.hits = {}
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_retries_5xx_honouring_retry_after(server):
+    session = PooledSession(max_retries=3, backoff_base=0.01)
+    response = session.get(server + "/flaky")
+    assert response.status_code == 200
+    assert StubHandler.hits["/flaky"] == 3
+    assert session.stats()["retries"] == 2
+
+
+def test_backoff_without_retry_after(server, monkeypatch):
+    delays = []
+    monkeypatch.setattr("src.http_session.time.sleep", delays.append)
+    session = PooledSession(max_retries=3, backoff_base=0.5, backoff_cap=8.0)
+    assert session.get(server + "/backoff").status_code == 200
+    assert len(delays) == 1 and 0.0 <= delays[0] <= 0.5
+
+
+def test_gives_up_after_max_retries(server):
+    session = PooledSession(max_retries=2, backoff_base=0.01)
+    response = session.get(server + "/limited")
+    assert response.status_code == 429
+    assert StubHandler.hits["/limited"] == 3
+
+
+def test_etag_revalidation_returns_cached_response(server):
+    session = PooledSession(max_retries=0)
+    first = session.get(server + "/etag", params={"q": "apple"})
+    second = session.get(server + "/etag", params={"q": "apple"})
+    assert second is first
+    assert second.json() == {"version": 1}
+    assert StubHandler.hits["/etag"] == 2
+    assert session.stats()["not_modified"] == 1
+
+
+def test_connection_errors_retry_then_raise():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    session = PooledSession(max_retries=1, backoff_base=0.01)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.get(f"http://127.0.0.1:{port}/", timeout=1)
+    assert session.stats()["requests"] == 2
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
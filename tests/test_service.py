@@ -0,0 +1,221 @@
+"""ResearchService over a stub pipeline fed by a SERVICE_NEWS_FIXTURE file"""
+
+import os
+import json
+import time
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from src.pipeline import Prepared
+from src.service import StaticNewsFetcher, create_app
+
+
+class StubStore:
+    def __init__(self, articles):
+        self.articles = articles
+
+    def get_context(self, question):
+        return "\n\n".join(a.title for a in self.articles)
+
+
+class StubRouter:
+    def last_provider(self):
+        return "Stub"
+
+    def provider_status(self):
+        return {}
+
+
+class StubSummarizer:
+    def __init__(self):
+        self.router = StubRouter()
+
+    async def aanswer_question(self, question, context, company, fingerprint=None):
+        return f"{company}: {context.splitlines()[0]}"
+
+    def summarize_articles(self, articles):
+        return [f"summary of {a.title}" for a in articles]
+
+
+class StubProcessor:
+    def process_articles(self, articles):
+        return articles
+
+
+class StubPipeline:
+    """Counts prepare/analyze calls; prepare is slow enough for requests to overlap"""
+
+    def __init__(self, fixture):
+        self.news = StaticNewsFetcher(fixture)
+        self.processor = StubProcessor()
+        self.summarizer = StubSummarizer()
+        self.calls = {"prepare": 0, "analyze": 0}
+        self._lock = threading.Lock()
+
+    def prepare(self, company, days=7, max_articles=10, snapshot_dir=None):
+        with self._lock:
+            self.calls["prepare"] += 1
+        time.sleep(0.2)
+        if company == "Outage":
+            raise ValueError("❌ Network error: connection refused")
+        articles = self.news.fetch_news(company, days, max_articles)
+        return Prepared(articles, StubStore(articles) if articles else None, {})
+
+    def analyze(self, company, days=7, max_articles=10, snapshot_dir=None, prepared=None):
+        with self._lock:
+            self.calls["analyze"] += 1
+        assert prepared is not None
+        status = "ok" if prepared.articles else "no_articles"
+        return {"company": company, "status": status, "articles": len(prepared.articles)}
+
+    def stats(self):
+        return dict(self.calls)
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    fixture = tmp_path / "news.jsonl"
+    rows = [
+        {
+            "title": f"Apple beats estimates {i}",
+            "description": "Revenue grew on iPhone demand.",
+            "content": "Analysts raised their targets.",
+            "url": f"https://example.com/apple/{i}",
+            "source": {"name": "Wire"},
+            "publishedAt": "2026-10-15T00:00:00Z"
+        }
+        for i in range(3)
+    ]
+    fixture.write_text("\n".join(json.dumps(r) for r in rows), encoding="utf-8")
+    monkeypatch.setenv("SERVICE_NEWS_FIXTURE", str(fixture))
+    return StubPipeline(os.environ["SERVICE_NEWS_FIXTURE"])
+
+
+def run(app, requests):
+    """Send (method, path, json) requests concurrently; returns the responses in order"""
+    async def send_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*[
+                client.request(method, path, json=body) for method, path, body in requests
+            ])
+    return asyncio.run(send_all())
+
+
+def test_analyze_and_ask_share_one_prepare(pipeline):
+    app = create_app(pipeline=pipeline)
+    responses = run(app, [
+        ("POST", "/analyze", {"company": "Apple"}),
+        ("POST", "/analyze", {"company": "apple"}),
+        ("POST", "/ask", {"company": "APPLE", "question": "What moved the stock?"}),
+        ("POST", "/summarize", {"company": "Apple"})
+    ])
+    assert [r.status_code for r in responses] == [200, 200, 200, 200]
+    assert pipeline.calls["prepare"] == 1
+    assert pipeline.calls["analyze"] == 1
+    assert responses[0].json() == {"company": "Apple", "status": "ok", "articles": 3}
+    assert responses[2].json()["answer"] == "APPLE: Apple beats estimates 0"
+    assert responses[2].json()["provider"] == "Stub"
+    assert len(responses[3].json()["summaries"]) == 3
+
+    # The indexed session is reused by later requests
+    run(app, [("POST", "/ask", {"company": "Apple", "question": "Risks?"})])
+    assert pipeline.calls["prepare"] == 1
+
+
+def test_summarize_posted_articles(pipeline):
+    app = create_app(pipeline=pipeline)
+    body = {"articles": [{"title": "Tesla deliveries", "content": "Up 20%.", "source": {"name": "Wire"}}]}
+    (response,) = run(app, [("POST", "/summarize", body)])
+    assert response.status_code == 200
+    assert response.json()["summaries"][0]["summary"] == "summary of Tesla deliveries"
+    assert response.json()["summaries"][0]["source"] == "Wire"
+    assert pipeline.calls["prepare"] == 0
+
+
+def test_errors(pipeline):
+    app = create_app(pipeline=pipeline)
+    responses = run(app, [
+        ("POST", "/ask", {"company": "Nothing", "question": "Anything?"}),
+        ("POST", "/ask", {"company": "Apple"}),
+        ("POST", "/analyze", {"company": "Apple", "days": 90}),
+        ("POST", "/summarize", {"articles": []}),
+        ("GET", "/analyze", None),
+        ("GET", "/missing", None)
+    ])
+    assert [r.status_code for r in responses] == [404, 400, 400, 400, 405, 404]
+    assert all("error" in r.json() for r in responses)
+
+    # Upstream failures are not the client's fault
+    (outage,) = run(app, [("POST", "/ask", {"company": "Outage", "question": "Anything?"})])
+    assert outage.status_code == 502
+    assert "Network error" in outage.json()["error"]
+
+    (no_news,) = run(app, [("POST", "/analyze", {"company": "Nothing"})])
+    assert no_news.status_code == 200
+    assert no_news.json()["status"] == "no_articles"
+
+
+def test_pipeline_is_built_off_the_event_loop(pipeline):
+    app = create_app()
+    threads = []
+
+    def build():
+        threads.append(threading.current_thread())
+        app.pipeline = pipeline
+        return pipeline
+
+    app._get_pipeline = build
+    (response,) = run(app, [("GET", "/health", None)])
+    assert response.status_code == 200
+    assert response.json()["pipeline"] == {"prepare": 0, "analyze": 0}
+    assert threads and threads[0] is not threading.main_thread()
+
+
+class FakeCompletions:
+    """Async chat client that answers `text` after `delay` seconds"""
+
+    def __init__(self, text, delay):
+        self.text = text
+        self.delay = delay
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        message = SimpleNamespace(content=self.text)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def test_ask_hedges_a_slow_primary(pipeline, monkeypatch):
+    monkeypatch.setenv("LLM_CACHE", "0")
+    monkeypatch.setenv("LLM_HEDGE", "1")
+    monkeypatch.setenv("LLM_HEDGE_DELAY", "0.05")
+    for key in ("GROQ_API_KEY", "OPENAI_API_KEY"):
+        monkeypatch.delenv(key, raising=False)
+    from src.summarizer import Summarizer
+
+    summarizer = Summarizer()
+    router = summarizer.router
+    slow, fast = FakeCompletions("slow answer", 2.0), FakeCompletions("fast answer", 0.01)
+    router._groq_client = router._openai_client = object()
+    router._async_clients = {
+        "Groq": SimpleNamespace(chat=SimpleNamespace(completions=slow)),
+        "OpenAI": SimpleNamespace(chat=SimpleNamespace(completions=fast))
+    }
+    pipeline.summarizer = summarizer
+    app = create_app(pipeline=pipeline)
+
+    start = time.perf_counter()
+    (response,) = run(app, [("POST", "/ask", {"company": "Apple", "question": "What moved the stock?"})])
+    assert response.status_code == 200
+    assert response.json()["answer"] == "fast answer"
+    assert response.json()["provider"] == "OpenAI"
+    assert router.hedges == 1 and router.hedge_wins == 1
+    assert slow.calls == 1 and fast.calls == 1
+    # prepare sleeps 0.2s; the 2s primary was abandoned
+    assert time.perf_counter() - start < 1.5